@@ -1,22 +1,17 @@
+import logging
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain_google_genai import ChatGoogleGenerativeAI
+from functools import lru_cache
 from typing import List
 
 from app.models.job import JobDetails
 from app.models.candidate import CandidateDetails
-from app.models.report import ScreeningReport
+from app.models.report import CandidateScore, ScreeningReport
+from app.core.config import MATCHER_BATCH_SIZE, MATCHER_TOP_K, MATCHER_CONCURRENCY
+from app.core.llm import get_chat_model
+from app.utils.retry import call_with_backoff
 
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-google_api_key = os.getenv("GOOGLE_API_KEY")
-
-# Initialize LLM
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash",
-                             google_api_key=google_api_key,
-                             temperature=0.1)
+logger = logging.getLogger(__name__)
 
 # We will add a "few-shot" example to improve the output quality.
 FEW_SHOT_EXAMPLE = """
@@ -52,21 +47,9 @@ Example Output:
 }
 """
 
-def candidate_matcher_agent(job_details: JobDetails, candidate_profiles: List[CandidateDetails]) -> ScreeningReport:
-    """
-    Compares the job to candidates and returns a ranked list with justifications.
-    """
-    print("--- Calling Candidate Matcher Agent ---")
+parser = PydanticOutputParser(pydantic_object=ScreeningReport)
 
-    # Format the candidate profiles into a single string for the prompt
-    candidate_profiles_str = "\n\n".join(
-        [f"Candidate ID: {c.candidate_id}\nExperience: {c.experience_years} years\nSkills: {', '.join(c.extracted_skills)}"
-         for c in candidate_profiles]
-    )
-
-    parser = PydanticOutputParser(pydantic_object=ScreeningReport)
-
-    prompt_template = """
+prompt_template = """
     You are a meticulous and unbiased expert HR recruitment manager. Your primary goal is to provide a quantitative and
     qualitative assessment of candidates based strictly on the information provided.
 
@@ -96,24 +79,123 @@ def candidate_matcher_agent(job_details: JobDetails, candidate_profiles: List[Ca
     {format_instructions}
     """
 
-    prompt = ChatPromptTemplate.from_template(
-        template=prompt_template,
-        partial_variables={
-            "format_instructions": parser.get_format_instructions(),
-            "few_shot_example": FEW_SHOT_EXAMPLE
-        }
-    )
+prompt = ChatPromptTemplate.from_template(
+    template=prompt_template,
+    partial_variables={
+        "format_instructions": parser.get_format_instructions(),
+        "few_shot_example": FEW_SHOT_EXAMPLE
+    }
+)
 
-    chain = prompt | llm | parser
+@lru_cache(maxsize=1)
+def get_matcher_chain():
+    """Builds the matcher chain on first use, so the LLM client is not created at import time."""
+    return prompt | get_chat_model(temperature=0.1) | parser
 
-    print("Matching candidates to job with LLM...")
 
-    report = chain.invoke({
+def _build_chain_input(job_details: JobDetails, candidate_profiles: List[CandidateDetails]) -> dict:
+    """Formats the job and candidate profiles into the variables of the matcher prompt."""
+    # Format the candidate profiles into a single string for the prompt
+    candidate_profiles_str = "\n\n".join(
+        [f"Candidate ID: {c.candidate_id}\nExperience: {c.experience_years} years\nSkills: {', '.join(c.extracted_skills)}"
+         for c in candidate_profiles]
+    )
+    return {
         "job_title": job_details.job_title,
         "required_experience": job_details.required_experience_years,
         "required_skills": ", ".join(job_details.required_skills),
         "candidate_profiles": candidate_profiles_str
-    })
+    }
+
+
+def candidate_matcher_agent(job_details: JobDetails, candidate_profiles: List[CandidateDetails]) -> ScreeningReport:
+    """
+    Compares the job to candidates and returns a ranked list with justifications.
+    """
+    logger.info("Matching %d candidate(s) to job with LLM...", len(candidate_profiles))
+
+    report = get_matcher_chain().invoke(_build_chain_input(job_details, candidate_profiles))
+
+    logger.info("Matching complete.")
+    return report
+
+
+def _keep_known_candidates(report: ScreeningReport, candidate_profiles: List[CandidateDetails]) -> List[CandidateScore]:
+    """Drops any scores for candidate IDs the LLM was not asked about, and duplicates."""
+    known_ids = {c.candidate_id for c in candidate_profiles}
+    scores, seen = [], set()
+    for score in report.ranked_candidates:
+        if score.candidate_id in known_ids and score.candidate_id not in seen:
+            seen.add(score.candidate_id)
+            scores.append(score)
+    return scores
+
+
+def score_shortlist(job_details: JobDetails, candidate_profiles: List[CandidateDetails]) -> List[CandidateScore]:
+    """
+    Scores a short list of candidates in a single matcher call, retrying on rate limits.
+    Returns the scores from best to worst; candidates the LLM skipped are missing.
+    """
+    report = call_with_backoff(get_matcher_chain().invoke, _build_chain_input(job_details, candidate_profiles))
+    scores = _keep_known_candidates(report, candidate_profiles)
+    scores.sort(key=lambda score: score.score, reverse=True)
+    return scores
+
+
+def rerank_finalists(job_details: JobDetails, finalists: List[CandidateScore],
+                     candidate_profiles: List[CandidateDetails]) -> List[CandidateScore]:
+    """
+    Re-scores candidates that were scored in separate matcher calls in a single call, so
+    their scores are directly comparable. candidate_profiles must include every finalist.
+    A finalist the re-rank drops keeps its earlier score.
+    """
+    logger.info("Re-ranking the top %d candidates...", len(finalists))
+    profile_map = {c.candidate_id: c for c in candidate_profiles}
+    reranked = score_shortlist(job_details, [profile_map[score.candidate_id] for score in finalists])
+    reranked_ids = {score.candidate_id for score in reranked}
+    reranked.extend(score for score in finalists if score.candidate_id not in reranked_ids)
+    reranked.sort(key=lambda score: score.score, reverse=True)
+    return reranked
+
+
+def hierarchical_candidate_matcher_agent(job_details: JobDetails,
+                                         candidate_profiles: List[CandidateDetails],
+                                         batch_size: int = MATCHER_BATCH_SIZE,
+                                         top_k: int = MATCHER_TOP_K,
+                                         max_concurrency: int = MATCHER_CONCURRENCY) -> ScreeningReport:
+    """
+    Tournament-style matching for large applicant pools.
+    Candidates are scored in fixed-size batches in parallel, the batch results are merged
+    into one global ranking, and the top-K are re-ranked together in a final pass so
+    their scores are directly comparable.
+    """
+    logger.info("Hierarchical matching of %d candidates", len(candidate_profiles))
+
+    # 1. Score fixed-size batches in parallel
+    batches = [candidate_profiles[i:i + batch_size] for i in range(0, len(candidate_profiles), batch_size)]
+    logger.info("Scoring %d batch(es) of up to %d candidates...", len(batches), batch_size)
+    chain = get_matcher_chain()
+    batch_reports = chain.batch(
+        [_build_chain_input(job_details, batch) for batch in batches],
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True,
+    )
 
-    print("Matching complete.")
-    return report
\ No newline at end of file
+    # 2. Merge the batch results into one global ranking
+    merged: List[CandidateScore] = []
+    for batch, batch_report in zip(batches, batch_reports):
+        if isinstance(batch_report, Exception):
+            # Retry a failed batch on its own before giving up on the whole ranking
+            logger.warning("Batch failed (%s), retrying...", batch_report)
+            batch_report = call_with_backoff(chain.invoke, _build_chain_input(job_details, batch))
+        merged.extend(_keep_known_candidates(batch_report, batch))
+    merged.sort(key=lambda score: score.score, reverse=True)
+
+    # 3. Re-rank the top-K in a single call so the finalists are judged side by side
+    finalists = merged[:top_k]
+    if len(batches) > 1 and finalists:
+        finalists = rerank_finalists(job_details, finalists, candidate_profiles)
+
+    logger.info("Matching complete.")
+    return ScreeningReport(job_title=job_details.job_title,
+                           ranked_candidates=finalists + merged[top_k:])
@@ -1,18 +1,11 @@
-import os
+import logging
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 from app.models.job import JobDetails
-from dotenv import load_dotenv
+from app.core.llm import get_chat_model
 
-load_dotenv()
-google_api_key = os.getenv("GOOGLE_API_KEY")
-
-# Initialize LLM
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash",
-                             google_api_key=google_api_key,
-                             temperature=0)
+logger = logging.getLogger(__name__)
 
 def job_parser_agent(job_description_text: str) -> JobDetails:
     """
@@ -39,13 +32,12 @@ def job_parser_agent(job_description_text: str) -> JobDetails:
     )
 
     # 3. Create the chain using LangChain Expression Language (LCEL)
-    chain = prompt | llm | parser
+    chain = prompt | get_chat_model(temperature=0) | parser
 
-    print("--- Calling Job Parser Agent ---")
-    print("Parsing job description with LLM...")
+    logger.info("Parsing job description with LLM...")
 
     # 4. Invoke the chain with input
     parsed_job_details = chain.invoke({"job_description": job_description_text})
 
-    print("Job parsing complete.")
+    logger.info("Job parsing complete.")
     return parsed_job_details
\ No newline at end of file
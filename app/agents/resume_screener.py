@@ -1,30 +1,48 @@
+import logging
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_google_genai import ChatGoogleGenerativeAI
-from dotenv import load_dotenv
+from langchain_core.output_parsers import PydanticOutputParser, JsonOutputParser
+from typing import List, Optional
 import uuid
-import os
 
-from app.models.candidate import CandidateDetails
+from app.models.candidate import CandidateDetails, BatchedCandidateDetails
 from app.utils.pii_masker import mask_pii
+from app.core.config import LLM_TIMEOUT_SECONDS
+from app.core.llm import get_chat_model
 
-load_dotenv()
-google_api_key = os.getenv("GOOGLE_API_KEY")
+logger = logging.getLogger(__name__)
 
-# Initialize LLM
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash",
-                             google_api_key=google_api_key,
-                             temperature=0)
+# Shared by the single and batched prompts
+EXPERIENCE_INSTRUCTIONS = """
+    **Instructions for extracting experience:**
+    1.  Carefully read the entire resume to understand the candidate's work history.
+    2.  Calculate the TOTAL number of years of professional experience.
+    3.  Internship experience counts as professional experience.
+    4.  If a range is given (e.g., "5-7 years"), use the lower number.
+    5.  The final output for "experience_years" must be an integer. If no experience is mentioned anywhere, and only then, default to 0.
+
+    **Example of your thought process:**
+    - Input: "A recent graduate with 3 years of internship experience at <ORGANIZATION>." -> Output: `experience_years: 3`
+    - Input: "Senior Engineer with a decade of experience." -> Output: `experience_yeras: 10`
+    - Input: "Experience from 2018 to 2022 in a software role." -> Output: `experience_years: 4`
+    """
 
 def resume_screener_agent(resume_text: str) -> CandidateDetails:
     """
     Takes raw resume text, masks PII, and returns a structured CandidateDetails object.
     """
-    print("--- Calling Resume Screener Agent ---")
+    logger.debug("Calling Resume Screener Agent")
 
     # Step 1: Mask PII before any other processing
     masked_resume_text = mask_pii(resume_text)
 
+    return extract_candidate_details(masked_resume_text)
+
+
+def extract_candidate_details(masked_resume_text: str) -> CandidateDetails:
+    """
+    Takes resume text that has already been PII-masked and returns a structured CandidateDetails object.
+    Used directly when resumes are masked in bulk with mask_pii_batch.
+    """
     # Step 2: Create a PydanticOutputParser for CandidateDetails
     parser = PydanticOutputParser(pydantic_object=CandidateDetails)
 
@@ -35,32 +53,21 @@ def resume_screener_agent(resume_text: str) -> CandidateDetails:
 
     Analyze the following masked resume:
     {masked_resume}
-
-    **Instructions for extracting experience:**
-    1.  Carefully read the entire resume to understand the candidate's work history.
-    2.  Calculate the TOTAL number of years of professional experience.
-    3.  Internship experience counts as professional experience.
-    4.  If a range is given (e.g., "5-7 years"), use the lower number.
-    5.  The final output for "experience_years" must be an integer. If no experience is mentioned anywhere, and only then, default to 0.
-
-    **Example of your thought process:**
-    - Input: "A recent graduate with 3 years of internship experience at <ORGANIZATION>." -> Output: `experience_years: 3`
-    - Input: "Senior Engineer with a decade of experience." -> Output: `experience_yeras: 10`
-    - Input: "Experience from 2018 to 2022 in a software role." -> Output: `experience_years: 4`
-    
+    {experience_instructions}
     Provide the final output in the required JSON format.
     {format_instructions}
     """
 
     prompt = ChatPromptTemplate.from_template(
         template=prompt_template,
-        partial_variables={"format_instructions": parser.get_format_instructions()}
+        partial_variables={"format_instructions": parser.get_format_instructions(),
+                           "experience_instructions": EXPERIENCE_INSTRUCTIONS}
     )
 
     # Step 4: Create the chain
-    chain = prompt | llm | parser
+    chain = prompt | get_chat_model(temperature=0, timeout=LLM_TIMEOUT_SECONDS) | parser
 
-    print("Parsing masked resume with LLM...")
+    logger.debug("Parsing masked resume with LLM...")
 
     # Step 5: Invoke the chain
     # We pass the masked text to the LLM
@@ -70,5 +77,59 @@ def resume_screener_agent(resume_text: str) -> CandidateDetails:
     parsed_candidate_details.candidate_id = f"CAND_{uuid.uuid4().hex[:6].upper()}"
     parsed_candidate_details.pii_masked = True
 
-    print("Resume screening complete.")
-    return parsed_candidate_details
\ No newline at end of file
+    logger.debug("Resume screening complete.")
+    return parsed_candidate_details
+
+
+def extract_candidate_details_batch(masked_resume_texts: List[str]) -> List[Optional[CandidateDetails]]:
+    """
+    Extracts CandidateDetails from several PII-masked resumes with a single LLM call,
+    so the instructions and format block are paid for once per batch instead of once per resume.
+    Returns one entry per resume, in input order. Entries are validated one by one: a resume
+    that is missing from the output or fails validation is None, so the caller can retry it alone.
+    """
+    parser = PydanticOutputParser(pydantic_object=BatchedCandidateDetails)
+
+    prompt_template = """
+    You are an expert HR analyst. Your task is to parse several candidates' resumes and extract key information from each one into a structured format.
+    The resumes you are analyzing have had Personally Identifiable Information (PII) like names and contact details removed and replaced with placeholders. (e.g., <PERSON>, <EMAIL_ADDRESS>).
+
+    Analyze the following {resume_count} masked resumes. Each one starts with a "### Resume <number>" line:
+    {masked_resumes}
+    {experience_instructions}
+    Treat every resume on its own. Return exactly one entry per resume, with "resume_index" set to the resume's number.
+    Provide the final output in the required JSON format.
+    {format_instructions}
+    """
+
+    prompt = ChatPromptTemplate.from_template(
+        template=prompt_template,
+        partial_variables={"format_instructions": parser.get_format_instructions(),
+                           "experience_instructions": EXPERIENCE_INSTRUCTIONS}
+    )
+
+    # Parse to plain JSON first, so one malformed entry does not discard the whole batch
+    chain = prompt | get_chat_model(temperature=0, timeout=LLM_TIMEOUT_SECONDS) | JsonOutputParser()
+
+    logger.debug("Parsing %d masked resumes with one LLM call...", len(masked_resume_texts))
+    masked_resumes = "\n\n".join(f"### Resume {i}\n{text}" for i, text in enumerate(masked_resume_texts, start=1))
+    output = chain.invoke({"masked_resumes": masked_resumes, "resume_count": len(masked_resume_texts)})
+
+    results: List[Optional[CandidateDetails]] = [None] * len(masked_resume_texts)
+    entries = output.get("candidates", []) if isinstance(output, dict) else []
+    for entry in entries:
+        try:
+            index = int(entry["resume_index"]) - 1
+            details = CandidateDetails.model_validate(
+                {"extracted_skills": entry["extracted_skills"], "experience_years": entry["experience_years"]}
+            )
+        except Exception:
+            continue
+        if 0 <= index < len(results) and results[index] is None:
+            details.candidate_id = f"CAND_{uuid.uuid4().hex[:6].upper()}"
+            details.pii_masked = True
+            results[index] = details
+
+    missing = sum(details is None for details in results)
+    logger.debug("Batched resume screening complete (%d parsed, %d to retry individually).", len(results) - missing, missing)
+    return results
@@ -1,11 +1,410 @@
-import langchain
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 from langchain_community.cache import SQLiteCache
+from langchain_core._api import suppress_langchain_beta_warning
+from langchain_core.caches import BaseCache, InMemoryCache
+from langchain_core.embeddings import Embeddings
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from app.core.config import (
+    EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_BYTES, EMBEDDING_CACHE_MEMORY_ITEMS, SQLITE_BUSY_TIMEOUT_MS,
+    LLM_CACHE_BACKEND, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_BYTES, LLM_CACHE_MEMORY_ITEMS,
+)
+from app.core.observability import registry
+
+# Candidate IDs are generated per run (CAND_<uuid>) or per database row (CAND_<id>).
+# They are swapped for positional placeholders in cache keys, so prompts that differ only
+# in these IDs share an entry, and swapped back into the cached response on a hit.
+VOLATILE_ID_PATTERN = re.compile(r"\bCAND_[A-Za-z0-9]+\b")
+PLACEHOLDER_PATTERN = re.compile(r"<<ID_(\d+)>>")
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_LOOKUPS = registry.counter("hr_llm_cache_lookups_total", "LLM cache lookups of this process, by result.",
+                                     ["result"])
+EMBEDDING_CACHE_LOOKUPS = registry.counter("hr_embedding_cache_lookups_total", "Embedding cache lookups, by result.",
+                                           ["result"])
+
+
+def normalize_prompt(prompt: str) -> Tuple[str, List[str]]:
+    """Replaces volatile IDs with <<ID_n>> in order of first appearance. Returns the text and the IDs."""
+    ids = list(dict.fromkeys(VOLATILE_ID_PATTERN.findall(prompt)))
+    positions = {volatile_id: i for i, volatile_id in enumerate(ids, start=1)}
+    return VOLATILE_ID_PATTERN.sub(lambda m: f"<<ID_{positions[m.group(0)]}>>", prompt), ids
+
 
-def setup_langchain_cache():
+def _to_placeholders(text: str, ids: List[str]) -> str:
+    positions = {volatile_id: i for i, volatile_id in enumerate(ids, start=1)}
+    return VOLATILE_ID_PATTERN.sub(lambda m: f"<<ID_{positions[m.group(0)]}>>" if m.group(0) in positions else m.group(0), text)
+
+
+def _from_placeholders(text: str, ids: List[str]) -> str:
+    return PLACEHOLDER_PATTERN.sub(lambda m: ids[int(m.group(1)) - 1] if int(m.group(1)) <= len(ids) else m.group(0), text)
+
+
+class _SizeCappedStore:
     """
-    Sets up a global SQLite cache for all LangChain LLM calls.
+    Size accounting shared by the SQLite-backed caches. Subclasses set table, max_bytes,
+    _conn and _memory; their table has key, size and last_access columns.
+    A running byte total avoids summing the table on every write. It only sees this process'
+    writes, so it is re-read from disk every resync_every_writes writes and before evicting.
+    """
+
+    table = ""
+    resync_every_writes = 1000
+
+    def _init_size_tracking(self):
+        self._disk_bytes = self._read_disk_bytes()
+        self._writes_since_resync = 0
+
+    def _read_disk_bytes(self) -> int:
+        return self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+
+    def _stored_size(self, keys: List[str]) -> int:
+        """Returns the total size of the rows stored under keys, i.e. the bytes that writing them again replaces."""
+        total = 0
+        # SQLite limits the number of bound parameters, so look up in slices
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            total += self._conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM {self.table} WHERE key IN ({placeholders})", batch
+            ).fetchone()[0]
+        return total
+
+    def _evict_lru(self, added_bytes: int, resync: bool = False) -> int:
+        """
+        Adds a write of added_bytes (net of replaced rows) to the running total, then deletes least
+        recently used rows until the store is back under 90% of max_bytes. Returns the number deleted.
+        """
+        self._disk_bytes += added_bytes
+        self._writes_since_resync += 1
+        if resync or self._disk_bytes > self.max_bytes or self._writes_since_resync >= self.resync_every_writes:
+            # Other processes sharing the file also write to it, so check the real size before evicting
+            self._disk_bytes = self._read_disk_bytes()
+            self._writes_since_resync = 0
+        total = self._disk_bytes
+        if total <= self.max_bytes:
+            return 0
+        target = int(self.max_bytes * 0.9)
+        victims = []
+        for key, size in self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY last_access"):
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= size
+            self._memory.pop(key, None)
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+        self._disk_bytes = total
+        return len(victims)
+
+
+class TieredLLMCache(_SizeCappedStore, BaseCache):
+    """
+    Exact-prompt LLM response cache: an in-process LRU tier over a SQLite store.
+    Disk entries expire after ttl_seconds and the least recently used ones are evicted
+    beyond max_bytes. The store runs in WAL mode with a busy timeout, so several worker
+    processes can share one file. Keys are normalized with normalize_prompt.
+    """
+
+    table = "llm_responses"
+    # Expired rows are already ignored on lookup, so they are only purged from disk this often
+    purge_interval_seconds = 60.0
+
+    def __init__(self, database_path: str = LLM_CACHE_PATH,
+                 ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 memory_items: int = LLM_CACHE_MEMORY_ITEMS):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        # key -> (created_at, normalized serialized generations)
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0,
+                      "bytes_written": 0, "evictions": 0, "expired": 0}
+        self._conn = sqlite3.connect(database_path, check_same_thread=False, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_last_access ON llm_responses (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_created_at ON llm_responses (created_at)")
+        self._conn.commit()
+        self._init_size_tracking()
+        self._last_purge = 0.0
+
+    @staticmethod
+    def _key(normalized_prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{normalized_prompt}".encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, value: str):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        normalized, ids = normalize_prompt(prompt)
+        key = self._key(normalized, llm_string)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[0], now):
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+            else:
+                self._memory.pop(key, None)
+                row = self._conn.execute("SELECT created_at, value FROM llm_responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and self._expired(row[0], now):
+                    self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.stats["expired"] += 1
+                    row = None
+                if row is None:
+                    self.stats["misses"] += 1
+                    return None
+                self._conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.stats["disk_hits"] += 1
+                entry = (row[0], row[1])
+                self._remember(key, *entry)
+        with suppress_langchain_beta_warning():
+            generations = loads(_from_placeholders(entry[1], ids))
+        # Lets the LLM metrics tell cached responses apart, so their tokens are not counted again
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            if message is not None:
+                message.response_metadata["cached"] = True
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        normalized, ids = normalize_prompt(prompt)
+        key = self._key(normalized, llm_string)
+        value = _to_placeholders(dumps(list(return_val)), ids)
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            replaced = self._stored_size([key])
+            self._conn.execute("INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?)", (key, value, size, now, now))
+            self.stats["writes"] += 1
+            self.stats["bytes_written"] += size
+            self._evict(now, size - replaced)
+            self._conn.commit()
+
+    def _evict(self, now: float, added_bytes: int):
+        """
+        Periodically purges expired rows, then deletes least recently used rows until under
+        90% of max_bytes.
+        """
+        purge = self.ttl_seconds > 0 and now - self._last_purge >= self.purge_interval_seconds
+        if purge:
+            self._last_purge = now
+            expired = self._conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+            self.stats["expired"] += max(expired, 0)
+        self.stats["evictions"] += self._evict_lru(added_bytes, resync=purge)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+            self._disk_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/byte counters of this process, plus the current size of the shared disk store."""
+        with self._lock:
+            entries, disk_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+            stats = dict(self.stats)
+            memory_items = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats.update(lookups=lookups,
+                     hit_rate=round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0,
+                     memory_items=memory_items, disk_entries=entries, disk_bytes=disk_bytes,
+                     max_bytes=self.max_bytes, ttl_seconds=self.ttl_seconds)
+        return stats
+
+
+def setup_langchain_cache(backend: str = LLM_CACHE_BACKEND):
+    """
+    Sets up the global cache for all LangChain LLM calls.
     This significantly speeds up repeated requests with the same prompt.
     """
-    print("--- Setting up LangChain global cache ---")
-    langchain.llm_cache = SQLiteCache(database_path=".langchain.db")
-    print("Cache setup complete.")
\ No newline at end of file
+    logger.info("Setting up LangChain global cache (%s)", backend)
+    if backend == "tiered":
+        set_llm_cache(TieredLLMCache())
+    elif backend == "memory":
+        set_llm_cache(InMemoryCache(maxsize=LLM_CACHE_MEMORY_ITEMS))
+    elif backend == "sqlite":
+        set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+    elif backend == "none":
+        set_llm_cache(None)
+    else:
+        raise ValueError(f"Unknown LLM cache backend: {backend}")
+    logger.info("Cache setup complete.")
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """Returns the counters of the global LLM cache (only the tiered cache keeps them)."""
+    cache = get_llm_cache()
+    if isinstance(cache, TieredLLMCache):
+        return {"backend": "tiered", **cache.get_stats()}
+    return {"backend": type(cache).__name__ if cache is not None else "none"}
+
+
+def _collect_llm_cache_metrics():
+    """Publishes the tiered cache's hit/miss counters on /metrics."""
+    cache = get_llm_cache()
+    if isinstance(cache, TieredLLMCache):
+        with cache._lock:
+            stats = dict(cache.stats)
+        for result in ("memory_hits", "disk_hits", "misses"):
+            yield LLM_CACHE_LOOKUPS, {"result": result}, stats[result]
+
+
+registry.register_collector(_collect_llm_cache_metrics)
+
+
+class EmbeddingCache(_SizeCappedStore):
+    """
+    Content-addressed store for embedding vectors.
+    An in-memory LRU layer sits over an on-disk SQLite store. When the disk store grows
+    past max_bytes, the least recently used vectors are evicted.
+    The memory layer keeps float32 arrays (about 3 KB per 768-dim vector, against about 25 KB
+    as a list of Python floats); they are turned into lists only when returned.
+    """
+
+    table = "embeddings"
+
+    def __init__(self, database_path: str = EMBEDDING_CACHE_PATH,
+                 max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+                 memory_items: int = EMBEDDING_CACHE_MEMORY_ITEMS):
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_access ON embeddings (last_access)")
+        self._conn.commit()
+        self._init_size_tracking()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Adds a vector to the in-memory LRU layer, dropping the oldest entry when full."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Returns the cached vectors for the given keys. Missing keys are left out."""
+        found = {}
+        with self._lock:
+            disk_keys = []
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                else:
+                    disk_keys.append(key)
+
+            # SQLite limits the number of bound parameters, so look up in slices
+            for start in range(0, len(disk_keys), 500):
+                batch = disk_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    self._remember(key, vector)
+                if rows:
+                    now = time.time()
+                    self._conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?",
+                                           [(now, key) for key, _ in rows])
+            self._conn.commit()
+        return {key: vector.tolist() for key, vector in found.items()}
+
+    def put_many(self, items: Dict[str, List[float]]):
+        """Stores vectors in both layers and evicts from disk if the size cap is exceeded."""
+        if not items:
+            return
+        now = time.time()
+        vectors = {key: np.asarray(vector, dtype=np.float32) for key, vector in items.items()}
+        rows = [(key, vector.tobytes(), vector.nbytes, now) for key, vector in vectors.items()]
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            replaced = self._stored_size(list(vectors))
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._evict_lru(sum(row[2] for row in rows) - replaced)
+            self._conn.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model so that each distinct piece of text is only embedded once.
+    Keys are the SHA-256 of the text, namespaced by the model name.
+    """
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache, namespace: str):
+        self.underlying = underlying
+        self.cache = cache
+        self.namespace = namespace
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\x00{text}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+        EMBEDDING_CACHE_LOOKUPS.inc(len(cached), result="hit")
+
+        # Embed each missing text once, even if it appears several times in the input
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            EMBEDDING_CACHE_LOOKUPS.inc(len(missing), result="miss")
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            new_items = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(new_items)
+            cached.update(new_items)
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(f"query\x00{text}")
+        cached = self.cache.get_many([key])
+        if key in cached:
+            EMBEDDING_CACHE_LOOKUPS.inc(result="hit")
+            return cached[key]
+        EMBEDDING_CACHE_LOOKUPS.inc(result="miss")
+        vector = self.underlying.embed_query(text)
+        self.cache.put_many({key: vector})
+        return vector
@@ -0,0 +1,135 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- LLM Settings ---
+# "google" (Gemini chat and embedding models) or "fake" (deterministic local stand-ins, no network needed)
+MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "google")
+# Chat model used by all agents and RAG chains
+CHAT_MODEL = os.getenv("CHAT_MODEL", "gemini-2.0-flash")
+# Embedding model used by the resume index and drill-down chains
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "models/text-embedding-004")
+# Simulated latency of the fake provider, per chat call and per embedding call
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.05"))
+FAKE_EMBEDDING_LATENCY_SECONDS = float(os.getenv("FAKE_EMBEDDING_LATENCY_SECONDS", "0.01"))
+
+# --- Observability Settings ---
+# Level of the application logs: DEBUG (includes a line per traced span), INFO, WARNING, ERROR or OFF
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+# --- RAG / Vector Store Settings ---
+# Directory of PDF resumes that make up the RAG corpus
+RESUME_DATA_DIR = os.getenv("RESUME_DATA_DIR", "data/")
+# Directory where the FAISS index and its file manifest are persisted
+# (each provider gets its own default directory, since their vectors are not interchangeable)
+VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", "vector_store/" if MODEL_PROVIDER == "google" else f"vector_store_{MODEL_PROVIDER}/")
+# Number of drill-down (single resume) RAG chains kept in memory
+DRILL_DOWN_CACHE_SIZE = int(os.getenv("DRILL_DOWN_CACHE_SIZE", "128"))
+# Worker processes that parse PDFs during ingestion (1 parses in the main process)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Chunks embedded per embedding call and added to the index at a time during ingestion
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64"))
+# Number of chunks handed to the LLM by /ask_rag
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+# Number of candidates each retriever (BM25 and vector) contributes before fusion and re-ranking
+RAG_FETCH_K = int(os.getenv("RAG_FETCH_K", "20"))
+# Weight of BM25 keyword search in the hybrid retriever: 0 is pure vector search, 1 pure BM25
+RAG_BM25_WEIGHT = float(os.getenv("RAG_BM25_WEIGHT", "0.5"))
+# Optional local cross-encoder for re-ranking, e.g. "cross-encoder/ms-marco-MiniLM-L-6-v2"
+# (needs sentence-transformers installed; empty disables re-ranking)
+RAG_RERANKER_MODEL = os.getenv("RAG_RERANKER_MODEL", "")
+
+# --- Database Settings ---
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///hr_database.db")
+# Optional read replica used by read-heavy endpoints (defaults to the primary database)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+# Log every SQL statement (very noisy, keep off in production)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+# How long a SQLite connection waits for the writer lock before failing
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# Load the demo jobs and candidates at startup when the database is empty
+SEED_DEMO_DATA = os.getenv("SEED_DEMO_DATA", "true").lower() == "true"
+# Applicants loaded per query when reading a job's applicant pool
+APPLICANT_PAGE_SIZE = int(os.getenv("APPLICANT_PAGE_SIZE", "1000"))
+# Rows per INSERT batch used by the bulk import command
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "5000"))
+
+# --- LLM Response Cache Settings ---
+# "tiered" (in-memory LRU over SQLite, with TTL and size cap), "memory", "sqlite" (LangChain's unbounded cache) or "none"
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "tiered")
+# SQLite file shared by all processes; WAL mode lets them read and write it concurrently
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".langchain.db")
+# Cached responses older than this are ignored and purged (0 keeps them forever)
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Size cap for the on-disk store; least recently used responses are evicted beyond it
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Number of responses kept in the in-memory LRU layer
+LLM_CACHE_MEMORY_ITEMS = int(os.getenv("LLM_CACHE_MEMORY_ITEMS", "2000"))
+
+# --- Embedding Cache Settings ---
+# SQLite file holding content-addressed embedding vectors
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".embedding_cache.db")
+# Size cap for the on-disk store; least recently used vectors are evicted beyond it
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Number of vectors kept in the in-memory LRU layer
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "10000"))
+
+# --- Screening Pipeline Settings ---
+# Maximum number of resumes screened concurrently
+SCREENING_CONCURRENCY = int(os.getenv("SCREENING_CONCURRENCY", "8"))
+# Resumes packed into one extraction prompt; 1 sends one prompt per resume
+SCREENING_BATCH_SIZE = int(os.getenv("SCREENING_BATCH_SIZE", "8"))
+# Timeout in seconds for a single LLM request, so one slow resume cannot stall a job
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+# Retry policy for rate-limited LLM calls (exponential backoff with jitter)
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "5"))
+RATE_LIMIT_BASE_DELAY_SECONDS = float(os.getenv("RATE_LIMIT_BASE_DELAY_SECONDS", "1.0"))
+RATE_LIMIT_MAX_DELAY_SECONDS = float(os.getenv("RATE_LIMIT_MAX_DELAY_SECONDS", "30.0"))
+# Number of background screening runs executed at the same time
+SCREENING_RUN_WORKERS = int(os.getenv("SCREENING_RUN_WORKERS", "2"))
+# Maximum number of queued or running background screening runs before new ones are rejected
+SCREENING_RUN_QUEUE_LIMIT = int(os.getenv("SCREENING_RUN_QUEUE_LIMIT", "20"))
+# Minimum seconds between progress writes of a background screening run (stage changes are written at once)
+SCREENING_RUN_PROGRESS_INTERVAL_SECONDS = float(os.getenv("SCREENING_RUN_PROGRESS_INTERVAL_SECONDS", "1.0"))
+# Matching mode: "single" (one prompt), "hierarchical" (batched tournament), "vector" (embedding
+# similarity shortlist, only the top-K are scored by the LLM and ranked) or "auto"
+MATCHING_MODE = os.getenv("MATCHING_MODE", "auto")
+# Candidates per matcher prompt in hierarchical mode; "auto" switches to hierarchical above this
+MATCHER_BATCH_SIZE = int(os.getenv("MATCHER_BATCH_SIZE", "50"))
+# Number of top candidates re-ranked together in the final hierarchical pass
+MATCHER_TOP_K = int(os.getenv("MATCHER_TOP_K", "20"))
+# Maximum number of matcher batches scored in parallel
+MATCHER_CONCURRENCY = int(os.getenv("MATCHER_CONCURRENCY", "4"))
+# Applicants with these application statuses (comma-separated) are left out of incremental screening runs
+SCREENING_EXCLUDED_STATUSES = [s.strip() for s in os.getenv("SCREENING_EXCLUDED_STATUSES", "Rejected").split(",") if s.strip()]
+# Default for incremental screening: only new or changed applicants are screened and merged into the stored ranking
+SCREENING_INCREMENTAL = os.getenv("SCREENING_INCREMENTAL", "false").lower() == "true"
+# Number of jobs ranked in parallel by a batch screening run (profiles are extracted once for all of them)
+BATCH_SCREENING_JOB_CONCURRENCY = int(os.getenv("BATCH_SCREENING_JOB_CONCURRENCY", "4"))
+
+# --- Pre-filter Settings ---
+# Deterministic skill/experience scoring that runs before the LLM matcher
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+# Candidates with a pre-score (0.0 - 1.0) below this are not sent to the matcher
+PREFILTER_MIN_SCORE = float(os.getenv("PREFILTER_MIN_SCORE", "0.2"))
+# Only the best N candidates by pre-score are sent to the matcher (0 = no limit)
+PREFILTER_TOP_N = int(os.getenv("PREFILTER_TOP_N", "0"))
+# Candidates missing more than this many years of the required experience are filtered out
+PREFILTER_MAX_EXPERIENCE_GAP = int(os.getenv("PREFILTER_MAX_EXPERIENCE_GAP", "3"))
+# Weight of skill overlap in the pre-score; the rest is the experience fit
+PREFILTER_SKILL_WEIGHT = float(os.getenv("PREFILTER_SKILL_WEIGHT", "0.7"))
+
+# --- PII Masking Settings ---
+# "presidio" (full NLP analyzer) or "regex" (emails and phone numbers only, no spaCy model)
+PII_MASKING_MODE = os.getenv("PII_MASKING_MODE", "presidio")
+# spaCy model used by the Presidio analyzer; "en_core_web_sm" is a lighter option
+PII_SPACY_MODEL = os.getenv("PII_SPACY_MODEL", "en_core_web_lg")
+# Number of texts per nlp.pipe batch when masking in bulk
+PII_BATCH_SIZE = int(os.getenv("PII_BATCH_SIZE", "32"))
+# Number of worker processes used for bulk masking
+PII_N_PROCESS = int(os.getenv("PII_N_PROCESS", "1"))
@@ -1,4 +1,64 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlmodel import create_engine
 
-DATABASE_URL = "sqlite:///hr_database.db"
-engine = create_engine(DATABASE_URL, echo=True)
\ No newline at end of file
+from app.core.config import (
+    DATABASE_URL, DATABASE_READ_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS, DB_ECHO, SQLITE_BUSY_TIMEOUT_MS,
+)
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tunes every new SQLite connection. WAL lets readers run alongside the single writer,
+    and busy_timeout makes writers wait for the lock instead of failing immediately.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.close()
+
+
+def create_db_engine(url: str, tuned: bool = True) -> Engine:
+    """
+    Creates an engine with pooling configured from settings.
+    SQLite engines also get the WAL and performance pragmas unless tuned=False.
+    """
+    is_sqlite = url.startswith("sqlite")
+    # Local SQLite connections cannot go stale, so only ping connections to a server
+    kwargs = {"echo": DB_ECHO, "pool_pre_ping": not is_sqlite}
+    if is_sqlite:
+        # Connections are shared across request threads through the pool
+        kwargs["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    if not (is_sqlite and ":memory:" in url):
+        kwargs.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT_SECONDS)
+
+    new_engine = create_engine(url, **kwargs)
+    if is_sqlite and tuned:
+        event.listen(new_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+
+engine = create_db_engine(DATABASE_URL)
+# Read-heavy endpoints use this engine; it points at the primary unless a replica is configured
+read_engine = create_db_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
+
+def _pool_metrics(pool) -> dict:
+    """Returns the usage counters of a connection pool (if the pool type tracks them)."""
+    metrics = {"pool_class": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            metrics[name] = counter()
+    return metrics
+
+
+def get_pool_metrics() -> dict:
+    """Returns connection pool metrics for every configured engine."""
+    metrics = {"primary": _pool_metrics(engine.pool)}
+    if read_engine is not engine:
+        metrics["read_replica"] = _pool_metrics(read_engine.pool)
+    return metrics
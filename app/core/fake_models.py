@@ -0,0 +1,152 @@
+import hashlib
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# Local stand-ins for the chat and embedding models, selected with MODEL_PROVIDER=fake.
+# They need no network or API key, answer deterministically from the prompt, and sleep for a
+# configurable latency, so the pipeline and the benchmarks can run fully offline.
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+
+def _stable_hash(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def _split_list(text: str) -> List[str]:
+    return [item.strip() for item in re.split(r"[,;]", text) if item.strip()]
+
+
+def _parse_resume(text: str) -> Dict[str, Any]:
+    """Reads "Experience: N years" and "Skills: a, b" from a (mock) resume."""
+    experience = re.search(r"(\d+)\+?\s*years", text)
+    skills = re.search(r"Skills:[ \t]*([^\n]*)", text)
+    return {
+        "extracted_skills": _split_list(skills.group(1).rstrip(".")) if skills else [],
+        "experience_years": int(experience.group(1)) if experience else 0,
+    }
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model. It recognizes the output schemas of the agents (job details,
+    candidate details, batched candidate details, screening report) in the format instructions
+    and fills them from the prompt; any other prompt gets a short answer quoting the context.
+    """
+    latency_seconds: float = 0.0
+    temperature: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": "fake-chat", "temperature": self.temperature}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency_seconds > 0:
+            time.sleep(self.latency_seconds)
+        prompt = "\n".join(str(message.content) for message in messages)
+        content = self.respond(prompt)
+        # Rough token counts (about 4 characters per token), so token metrics work offline too
+        input_tokens, output_tokens = len(prompt) // 4 + 1, len(content) // 4 + 1
+        message = AIMessage(content=content, usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens,
+                                                             "total_tokens": input_tokens + output_tokens})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def respond(self, prompt: str) -> str:
+        if '"ranked_candidates"' in prompt:
+            return json.dumps(self._screening_report(prompt))
+        if '"resume_index"' in prompt:
+            return json.dumps(self._batched_candidate_details(prompt))
+        if '"extracted_skills"' in prompt:
+            section = prompt.split("masked resume:", 1)[-1].split("**Instructions", 1)[0]
+            return json.dumps(_parse_resume(section))
+        if '"required_skills"' in prompt:
+            return json.dumps(self._job_details(prompt))
+        return self._answer(prompt)
+
+    @staticmethod
+    def _job_details(prompt: str) -> Dict[str, Any]:
+        description = prompt.split("job description:", 1)[-1].split("Please provide", 1)[0]
+        title = re.search(r"Title:[ \t]*([^.\n]*)", description)
+        experience = re.search(r"(\d+)\s*years", description)
+        skills = re.search(r"\(([^)]*)\)", title.group(1)) if title else None
+        return {
+            "job_title": title.group(1).strip() if title else "Unknown",
+            "required_skills": _split_list(skills.group(1)) if skills else [],
+            "required_experience_years": int(experience.group(1)) if experience else 0,
+            "key_responsibilities": [],
+        }
+
+    @staticmethod
+    def _batched_candidate_details(prompt: str) -> Dict[str, Any]:
+        resumes = re.split(r"### Resume (\d+)\n", prompt.split("**Instructions", 1)[0])
+        return {"candidates": [{"resume_index": int(index), **_parse_resume(text)}
+                               for index, text in zip(resumes[1::2], resumes[2::2])]}
+
+    @staticmethod
+    def _screening_report(prompt: str) -> Dict[str, Any]:
+        # The real request follows the few-shot example, so read the last job block
+        request = prompt[prompt.rfind("Job Description Details"):]
+        title = re.search(r"Title:[ \t]*([^\n]*)", request)
+        experience = re.search(r"Required Experience:[ \t]*(\d+)", request)
+        skills = re.search(r"Required Skills:[ \t]*([^\n]*)", request)
+        required = {skill.lower() for skill in _split_list(skills.group(1))} if skills else set()
+        required_years = int(experience.group(1)) if experience else 0
+
+        ranked = []
+        for candidate_id, years, candidate_skills in re.findall(
+                r"Candidate ID:[ \t]*(\S+)\nExperience:[ \t]*(\d+) years\nSkills:[ \t]*([^\n]*)", request):
+            overlap = len(required & {s.lower() for s in _split_list(candidate_skills)}) / len(required) if required else 1.0
+            experience_fit = min(1.0, int(years) / required_years) if required_years else 1.0
+            score = max(1, min(10, round(1 + 9 * (0.7 * overlap + 0.3 * experience_fit))))
+            ranked.append({"candidate_id": candidate_id, "score": score,
+                           "justification": f"Covers {overlap:.0%} of the required skills with {years} years of experience."})
+        ranked.sort(key=lambda candidate: -candidate["score"])
+        return {"job_title": title.group(1).strip() if title else "Unknown", "ranked_candidates": ranked}
+
+    @staticmethod
+    def _answer(prompt: str) -> str:
+        context = prompt.split("Context:", 1)[-1].split("Question:", 1)[0]
+        snippet = " ".join(context.split())[:200]
+        return f"Based on the provided context: {snippet}" if snippet else "I don't know."
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic embedder using feature hashing of the words in a text, so texts that share
+    words get similar vectors (unlike random fakes) and retrieval results stay meaningful.
+    """
+
+    def __init__(self, size: int = 768, latency_seconds: float = 0.0):
+        self.size = size
+        self.latency_seconds = latency_seconds
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            token_hash = _stable_hash(token)
+            vector[token_hash % self.size] += 1.0 if (token_hash >> 32) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency_seconds > 0:
+            time.sleep(self.latency_seconds)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency_seconds > 0:
+            time.sleep(self.latency_seconds)
+        return self._embed(text)
@@ -0,0 +1,56 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import (
+    MODEL_PROVIDER, CHAT_MODEL, EMBEDDING_MODEL, FAKE_LLM_LATENCY_SECONDS, FAKE_EMBEDDING_LATENCY_SECONDS,
+)
+from app.core.observability import LLMMetricsCallback
+
+@lru_cache(maxsize=None)
+def get_chat_model(temperature: float = 0, timeout: Optional[float] = None):
+    """
+    Returns a shared chat model client for the given settings.
+    Clients are created on first use instead of at import time, which keeps
+    application startup fast. Every client reports its calls and token usage to /metrics.
+    """
+    if MODEL_PROVIDER == "fake":
+        from app.core.fake_models import FakeChatModel
+
+        return FakeChatModel(temperature=temperature, latency_seconds=FAKE_LLM_LATENCY_SECONDS,
+                             callbacks=[LLMMetricsCallback("fake-chat")])
+    if MODEL_PROVIDER != "google":
+        raise ValueError(f"Unknown model provider: {MODEL_PROVIDER}")
+
+    # Imported here so that importing the agents does not pull in the Google client libraries
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(model=CHAT_MODEL,
+                                  google_api_key=os.getenv("GOOGLE_API_KEY"),
+                                  temperature=temperature,
+                                  timeout=timeout,
+                                  callbacks=[LLMMetricsCallback(CHAT_MODEL)])
+
+
+def get_embedding_model():
+    """Returns a new client for the configured embedding model."""
+    if MODEL_PROVIDER == "fake":
+        from app.core.fake_models import FakeEmbeddings
+
+        return FakeEmbeddings(latency_seconds=FAKE_EMBEDDING_LATENCY_SECONDS)
+    if MODEL_PROVIDER != "google":
+        raise ValueError(f"Unknown model provider: {MODEL_PROVIDER}")
+
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    return GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL)
+
+
+def get_embedding_namespace() -> str:
+    """Returns the name embedding cache keys are namespaced by, so providers never share vectors."""
+    return EMBEDDING_MODEL if MODEL_PROVIDER == "google" else f"{MODEL_PROVIDER}:{EMBEDDING_MODEL}"
+
+
+def requires_api_key() -> bool:
+    """Returns True if the configured provider needs GOOGLE_API_KEY."""
+    return MODEL_PROVIDER == "google"
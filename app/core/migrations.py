@@ -0,0 +1,64 @@
+import logging
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Connection, text
+from sqlmodel import SQLModel
+
+from app.core.database import engine
+# Import every table model so SQLModel.metadata knows about all of them
+from app.models.job import Job, JobApplication, JobProfile, JobScreeningResult  # noqa: F401
+from app.models.candidate import Candidate, CandidateProfile, CandidateSkill, split_skills  # noqa: F401
+from app.models.screening_run import ScreeningRun  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# Ordered list of (version, description, upgrade function).
+# New tables are created by create_all; migrations handle changes to existing tables
+# (new indexes, columns, backfills). Append new migrations, never edit applied ones.
+def _add_applicant_indexes_and_skill_table(connection: Connection):
+    """Indexes the applicant lookups and backfills CandidateSkill from skills_string."""
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_jobapplication_candidate_id ON jobapplication (candidate_id)"))
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_jobapplication_job_id_status ON jobapplication (job_id, status)"))
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_candidate_experience_years ON candidate (experience_years)"))
+
+    rows = connection.execute(text("SELECT id, skills_string FROM candidate")).all()
+    skill_rows = [{"skill": skill, "candidate_id": candidate_id}
+                  for candidate_id, skills_string in rows for skill in split_skills(skills_string or "")]
+    if skill_rows:
+        connection.execute(text("INSERT INTO candidateskill (skill, candidate_id) VALUES (:skill, :candidate_id)"),
+                           skill_rows)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Baseline schema", lambda connection: None),
+    (2, "Applicant indexes and normalized candidate skills", _add_applicant_indexes_and_skill_table),
+]
+
+
+def get_schema_version(connection: Connection) -> int:
+    """Returns the schema version recorded in the database (0 if none)."""
+    connection.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    version = connection.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    return version or 0
+
+
+def bootstrap_database():
+    """
+    Idempotent schema bootstrap. Creates missing tables and applies pending migrations,
+    each in its own transaction. Existing data is never touched, so this is safe to run
+    on every startup.
+    """
+    SQLModel.metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        current_version = get_schema_version(connection)
+
+    for version, description, upgrade in MIGRATIONS:
+        if version <= current_version:
+            continue
+        logger.info("Applying migration %s: %s", version, description)
+        with engine.begin() as connection:
+            upgrade(connection)
+            connection.execute(text("INSERT INTO schema_version (version) VALUES (:version)"), {"version": version})
+
+    logger.info("Database schema is up to date")
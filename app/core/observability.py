@@ -0,0 +1,274 @@
+import contextvars
+import logging
+import sys
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.core.config import LOG_LEVEL, LOG_FORMAT
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from a cached lookup up to a full screening run
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def setup_logging(level: str = LOG_LEVEL):
+    """
+    Sends the application's log records ("app.*" loggers) to stdout.
+    LOG_LEVEL=OFF silences them entirely.
+    """
+    app_logger = logging.getLogger("app")
+    if level.upper() == "OFF":
+        app_logger.disabled = True
+        return
+    app_logger.disabled = False
+    app_logger.setLevel(level.upper())
+    if not app_logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        app_logger.addHandler(handler)
+    # Our handler prints the records, the root logger must not print them a second time
+    app_logger.propagate = False
+
+
+# --- Metrics ---
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(labelnames, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """Yields (name suffix, formatted labels, value) for every label combination."""
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield "", _format_labels(self.labelnames, key), value
+
+
+class Counter(_Metric):
+    """A value that only goes up, such as a number of requests or tokens."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, such as a queue depth."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self._set(value, **labels)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Counts observations (e.g. latencies) in cumulative buckets, plus their count and sum."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield "_bucket", _format_labels(self.labelnames, key, ("le", le)), cumulative
+            yield "_count", _format_labels(self.labelnames, key), cumulative
+            yield "_sum", _format_labels(self.labelnames, key), total
+
+
+# A collector is called on every scrape and returns (metric, labels, value) samples for values
+# that are tracked elsewhere, such as the LLM cache counters; they overwrite the metric's value
+Collector = Callable[[], Iterable[Tuple[_Metric, Dict[str, Any], float]]]
+
+
+class MetricsRegistry:
+    """Holds the process' metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = metric_class(name, documentation, labelnames, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Runs the collectors, then returns every metric as Prometheus text."""
+        for collector in list(self._collectors):
+            try:
+                for metric, labels, value in collector():
+                    metric._set(value, **labels)
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", getattr(collector, "__name__", collector), e)
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{labels} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+SPAN_SECONDS = registry.histogram("hr_span_duration_seconds", "Duration of each traced pipeline stage.", ["span"])
+SPAN_ERRORS = registry.counter("hr_span_errors_total", "Traced stages that raised an error.", ["span"])
+LLM_REQUESTS = registry.counter("hr_llm_requests_total", "Chat model responses, by model and source (llm or cache).",
+                                ["model", "source"])
+LLM_TOKENS = registry.counter("hr_llm_tokens_total", "Tokens used by chat model calls (cache hits excluded).",
+                              ["model", "type"])
+LLM_SECONDS = registry.histogram("hr_llm_request_duration_seconds", "Duration of chat model calls.", ["model"])
+
+
+# --- Tracing ---
+
+current_span: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("current_span", default=None)
+span_logger = logging.getLogger("app.trace")
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Traces the wrapped block as a named stage: records its duration in hr_span_duration_seconds
+    and logs a structured line (at DEBUG) with its trace ID, parent span and attributes.
+    Yields the span's attribute dict, so the block can add attributes such as result counts.
+    """
+    parent = current_span.get()
+    record = {"trace_id": parent["trace_id"] if parent else uuid.uuid4().hex[:16],
+              "span_id": uuid.uuid4().hex[:8],
+              "parent_id": parent["span_id"] if parent else None,
+              "attributes": dict(attributes)}
+    token = current_span.set(record)
+    status = "ok"
+    started = time.perf_counter()
+    try:
+        yield record["attributes"]
+    except BaseException:
+        status = "error"
+        SPAN_ERRORS.inc(span=name)
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        current_span.reset(token)
+        SPAN_SECONDS.observe(duration, span=name)
+        if span_logger.isEnabledFor(logging.DEBUG):
+            fields = " ".join(f"{key}={value}" for key, value in record["attributes"].items())
+            span_logger.debug("span=%s trace_id=%s span_id=%s parent_id=%s status=%s duration_ms=%.1f %s",
+                              name, record["trace_id"], record["span_id"], record["parent_id"] or "-",
+                              status, duration * 1000, fields)
+
+
+def submit_in_context(executor, func: Callable, *args, **kwargs):
+    """executor.submit that runs func in a copy of the caller's context, so its spans nest under the caller's."""
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+# --- LLM metrics ---
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    Counts chat model calls, their latency and their token usage.
+    Responses served from the LLM cache are counted separately and add no tokens.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self._started.pop(run_id, None)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            LLM_SECONDS.observe(time.perf_counter() - started, model=self.model)
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is not None and message.response_metadata.get("cached"):
+                    LLM_REQUESTS.inc(model=self.model, source="cache")
+                    continue
+                LLM_REQUESTS.inc(model=self.model, source="llm")
+                usage = getattr(message, "usage_metadata", None) or {}
+                LLM_TOKENS.inc(usage.get("input_tokens", 0), model=self.model, type="input")
+                LLM_TOKENS.inc(usage.get("output_tokens", 0), model=self.model, type="output")
@@ -0,0 +1,51 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Durations (in seconds) of each import and startup phase, in the order they ran
+phase_timings: Dict[str, float] = {}
+ready_event = threading.Event()
+startup_error: Optional[str] = None
+
+
+def record_phase(name: str, seconds: float):
+    """Records how long a startup phase took."""
+    phase_timings[name] = round(seconds, 3)
+    logger.info("Startup phase '%s' took %.2fs", name, seconds)
+
+
+@contextmanager
+def startup_phase(name: str):
+    """Times the wrapped block as a named startup phase."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - started)
+
+
+def mark_ready():
+    ready_event.set()
+
+
+def mark_failed(error: Exception):
+    global startup_error
+    startup_error = str(error)
+
+
+def is_ready() -> bool:
+    return ready_event.is_set()
+
+
+def get_startup_report() -> dict:
+    """Returns the readiness state together with the timing of every startup phase."""
+    return {
+        "ready": is_ready(),
+        "error": startup_error,
+        "phases": dict(phase_timings),
+        "total_seconds": round(sum(phase_timings.values()), 3),
+    }
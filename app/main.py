@@ -1,32 +1,91 @@
-from pydantic import BaseModel
-from fastapi import FastAPI, HTTPException
+import time
+_import_started = time.perf_counter()
+
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+import asyncio
+import json
+import logging
 import os
+import threading
+
+from sqlmodel import Session
 
-from app.core.caching import setup_langchain_cache
-from app.services.screening_services import run_screening_pipeline_for_job
-from app.services.rag_service import create_rag_chain, load_and_build_vector_store, create_text_rag_chain
+from app.core import startup
+from app.core.caching import get_llm_cache_stats, setup_langchain_cache
+from app.core.config import PII_MASKING_MODE, SEED_DEMO_DATA, SCREENING_INCREMENTAL
+from app.core.migrations import bootstrap_database
+from app.core.database import get_pool_metrics, read_engine
+from app.core.llm import requires_api_key
+from app.core.observability import METRICS_CONTENT_TYPE, registry, setup_logging, span
+from app.services.screening_services import run_batch_screening, run_screening_pipeline_for_job
+from app.services.rag_service import get_rag_chain, get_retriever, load_and_build_vector_store, create_text_rag_chain
+from app.services.candidate_queries import find_candidate_ids
 from scripts.seed_db import seed_database
+from app.services.screening_jobs import (
+    ScreeningQueueFullError, TERMINAL_STATUSES, fail_interrupted_runs, get_screening_run,
+    get_screening_run_report, shutdown_screening_runs, submit_screening_run,
+)
+from app.models.candidate import Candidate
 from app.models.report import ScreeningReport
+from app.models.screening_run import ScreeningRunStatus
+from app.utils.pii_masker import get_analyzer
+
+setup_logging()
+logger = logging.getLogger(__name__)
+startup.record_phase("import app.main", time.perf_counter() - _import_started)
 
 # --- Application Lifecycle ---
+def warm_up():
+    """
+    Initializes the heavy components in the background, timing each phase.
+    The API serves / and the health endpoints while this runs; endpoints that
+    need these components answer 503 until it finishes.
+    """
+    try:
+        with startup.startup_phase("llm_cache"):
+            setup_langchain_cache()
+        with startup.startup_phase("database"):
+            # Idempotent: creates/migrates the schema and never wipes existing data
+            bootstrap_database()
+            if SEED_DEMO_DATA:
+                seed_database()
+            fail_interrupted_runs()
+        with startup.startup_phase("vector_store"):
+            load_and_build_vector_store()
+        with startup.startup_phase("rag_chain"):
+            # Build the RAG chain once so requests reuse the same LLM client, prompt and retriever
+            get_rag_chain()
+        if PII_MASKING_MODE == "presidio":
+            with startup.startup_phase("pii_analyzer"):
+                get_analyzer()
+        startup.mark_ready()
+        logger.info("Application ready.")
+    except Exception as e:
+        startup.mark_failed(e)
+        logger.exception("Application warm-up failed: %s", e)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Code to run on startup
-    print("--- Application starting up... ---")
+    logger.info("Application starting up...")
     load_dotenv()
-    if "GOOGLE_API_KEY" not in os.environ:
+    if requires_api_key() and "GOOGLE_API_KEY" not in os.environ:
         raise RuntimeError("GOOGLE_API_KEY not found in .env file.")
-    
-    load_and_build_vector_store()
-    setup_langchain_cache()
-    seed_database()
+
+    # Heavy initialization runs in the background so a new replica accepts traffic at once
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
 
     yield
 
     # Code to run on shutdown
-    print("--- Application shutting down... ---")
+    logger.info("Application shutting down...")
+    shutdown_screening_runs()
 
 
 # --- FastAPI App Initialization ---
@@ -40,6 +99,12 @@ app = FastAPI(
 # --- Pydantic Models ---
 class QuestionRequest(BaseModel):
     question: str
+    # Optional metadata filter on the resume chunks, e.g. {"file_name": "resume1.pdf"}
+    filters: Optional[Dict[str, Any]] = None
+    top_k: Optional[int] = Field(None, ge=1)
+    # Optional candidate selection, applied before the search: applicants of a job, minimum experience
+    job_id: Optional[int] = None
+    min_experience: Optional[int] = None
 
 class AnswerResponse(BaseModel):
     answer: str
@@ -48,6 +113,36 @@ class DrillDownRequest(BaseModel):
     context_text: str
     question: str
 
+class ResumeChunk(BaseModel):
+    candidate_id: Optional[str] = None
+    file_name: Optional[str] = None
+    page: Optional[int] = None
+    text: str
+
+class ResumeResponse(BaseModel):
+    candidate_id: str
+    resume_text: str
+
+class BatchScreeningRequest(BaseModel):
+    job_ids: List[int] = Field(..., min_length=1)
+    incremental: bool = SCREENING_INCREMENTAL
+    include_resume_text: bool = False
+
+
+def resolve_candidate_ids(request: QuestionRequest) -> Optional[List[str]]:
+    """Turns the job and experience criteria of a request into candidate IDs (None if there are none)."""
+    if request.job_id is None and request.min_experience is None:
+        return None
+    with Session(read_engine) as session:
+        return [f"CAND_{candidate_id}" for candidate_id in
+                find_candidate_ids(session, job_id=request.job_id, min_experience=request.min_experience)]
+
+
+def require_ready():
+    """Dependency that rejects requests until the background warm-up has finished."""
+    if not startup.is_ready():
+        raise HTTPException(status_code=503, detail="The service is still starting up. Check GET /ready.")
+
 
 # --- API Endpoints ---
 @app.get("/")
@@ -56,47 +151,251 @@ def read_root():
     return {"message": "Welcome to the Agentic HR Screening API!"}
 
 
-@app.post("/screen/{job_id}", response_model=ScreeningReport)
-def screen_candidates_for_job(job_id: int):
+@app.get("/health")
+def health():
+    """Liveness probe. Answers as soon as the process is serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe. Returns 503 until the background warm-up has finished,
+    along with the timing of every import and startup phase.
+    """
+    report = startup.get_startup_report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+
+@app.get("/db/pool")
+def database_pool_metrics():
+    """Returns connection pool usage for the primary (and, if configured, read replica) engines."""
+    return get_pool_metrics()
+
+
+@app.get("/metrics")
+def metrics():
+    """
+    Returns Prometheus metrics: per-stage latency histograms of the screening pipeline and
+    RAG chains, LLM calls and token counts, cache hits and screening queue depth.
+    """
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/cache/stats")
+def llm_cache_stats():
+    """Returns hit/miss/byte counters of the LLM response cache."""
+    return get_llm_cache_stats()
+
+
+@app.post("/screen/batch", response_model=Dict[int, Optional[ScreeningReport]], dependencies=[Depends(require_ready)])
+def screen_candidates_for_jobs(request: BatchScreeningRequest):
+    """
+    Screens several jobs in one run. Applicants of more than one job are masked and extracted
+    once; each job is then ranked separately. Jobs without applicants, and jobs whose
+    screening failed (see the logs), map to null.
+    """
+    try:
+        logger.info("Received request to screen jobs: %s", request.job_ids)
+        return run_batch_screening(request.job_ids, incremental=request.incremental,
+                                   include_resume_text=request.include_resume_text)
+    except Exception as e:
+        logger.exception("An error occurred while screening jobs %s: %s", request.job_ids, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/screen/{job_id}", response_model=ScreeningReport, dependencies=[Depends(require_ready)])
+def screen_candidates_for_job(job_id: int, incremental: bool = SCREENING_INCREMENTAL):
     """
     Triggers the end-to-end screening pipeline for a given job ID.
+    With incremental=true only applicants added or changed since the last run are screened
+    and merged into the stored ranking; rejected applicants are dropped without a rerun.
     """
     try:
-        print(f"--- Received request to screen for job_id: {job_id} ---")
-        report = run_screening_pipeline_for_job(job_id)
+        logger.info("Received request to screen for job_id: %s", job_id)
+        report = run_screening_pipeline_for_job(job_id, incremental=incremental)
         if report is None:
             raise HTTPException(status_code=404, detail=f"No report generated. Job ID {job_id} might not have applicants or exist.")
         return report
     except Exception as e:
-        print(f"An error occurred: {e}")
+        logger.exception("An error occurred while screening job %s: %s", job_id, e)
         raise HTTPException(status_code=500, detail=str(e))
     
 
-@app.post("/ask_rag", response_model=AnswerResponse)
+def format_stream_event(event: str, payload: dict, stream_format: str) -> str:
+    """Serializes one pipeline event as a Server-Sent Event or an NDJSON line."""
+    if stream_format == "ndjson":
+        return json.dumps({"event": event, "data": payload}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.post("/screen/{job_id}/stream", dependencies=[Depends(require_ready)])
+async def stream_screening_for_job(job_id: int, format: str = Query("sse", pattern="^(sse|ndjson)$"),
+                                   incremental: bool = SCREENING_INCREMENTAL):
+    """
+    Runs the screening pipeline and streams results as they become ready:
+    a "candidate" event per screened applicant, then "filtered" and "score" events
+    (in rank order) once matching is done, and a final "done" (or "error") event.
+    Resume text is not inlined; fetch it with GET /candidates/{candidate_id}/resume.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_event(event: str, payload: BaseModel):
+        loop.call_soon_threadsafe(queue.put_nowait, (event, payload.model_dump(mode="json", exclude_none=True)))
+
+    def run_pipeline():
+        try:
+            report = run_screening_pipeline_for_job(job_id, event_callback=on_event, include_resume_text=False,
+                                                    incremental=incremental)
+            if report is None:
+                result = ("error", {"status_code": 404, "detail": f"No report generated. Job ID {job_id} might not have applicants or exist."})
+            else:
+                result = ("done", {"job_title": report.job_title, "ranked": len(report.ranked_candidates),
+                                   "filtered": len(report.filtered_candidates)})
+        except Exception as e:
+            logger.exception("An error occurred while streaming job %s: %s", job_id, e)
+            result = ("error", {"status_code": 500, "detail": str(e)})
+        loop.call_soon_threadsafe(queue.put_nowait, result)
+
+    async def event_stream():
+        worker = asyncio.create_task(asyncio.to_thread(run_pipeline))
+        try:
+            while True:
+                event, payload = await queue.get()
+                yield format_stream_event(event, payload, format)
+                if event in ("done", "error"):
+                    break
+        finally:
+            await worker
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(event_stream(), media_type=media_type)
+
+
+@app.get("/candidates/{candidate_id}/resume", response_model=ResumeResponse)
+def get_candidate_resume(candidate_id: str):
+    """
+    Returns the full resume text of a candidate, by database ID or report ID (e.g. CAND_12).
+    """
+    db_id = candidate_id.removeprefix("CAND_")
+    if not db_id.isdigit():
+        raise HTTPException(status_code=404, detail=f"Candidate {candidate_id} not found.")
+    with Session(read_engine) as session:
+        candidate = session.get(Candidate, int(db_id))
+    if candidate is None:
+        raise HTTPException(status_code=404, detail=f"Candidate {candidate_id} not found.")
+    return ResumeResponse(candidate_id=f"CAND_{candidate.id}", resume_text=candidate.resume_text)
+
+
+@app.post("/screen/{job_id}/runs", response_model=ScreeningRunStatus, status_code=202, dependencies=[Depends(require_ready)])
+def submit_screening_run_for_job(job_id: int, incremental: bool = SCREENING_INCREMENTAL):
+    """
+    Queues the screening pipeline for a job in the background and returns a run ID at once.
+    Poll GET /screen/runs/{run_id} or stream /screen/runs/{run_id}/events for progress.
+    """
+    try:
+        run = submit_screening_run(job_id, incremental=incremental)
+    except ScreeningQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return ScreeningRunStatus.model_validate(run)
+
+
+@app.get("/screen/runs/{run_id}", response_model=ScreeningRunStatus)
+def get_screening_run_status(run_id: str):
+    """
+    Returns the progress of a background screening run.
+    """
+    run = get_screening_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Screening run {run_id} not found.")
+    return ScreeningRunStatus.model_validate(run)
+
+
+@app.get("/screen/runs/{run_id}/report", response_model=ScreeningReport)
+def get_screening_run_result(run_id: str):
+    """
+    Returns the persisted report of a completed screening run without re-running it.
+    """
+    run = get_screening_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Screening run {run_id} not found.")
+    if run.status == "failed":
+        raise HTTPException(status_code=500, detail=run.error)
+    report = get_screening_run_report(run)
+    if report is None:
+        raise HTTPException(status_code=409, detail=f"Screening run {run_id} is still {run.status}.")
+    return report
+
+
+@app.get("/screen/runs/{run_id}/events")
+async def stream_screening_run_events(run_id: str):
+    """
+    Streams progress updates of a background screening run as Server-Sent Events.
+    The stream ends once the run has completed or failed.
+    """
+    if await asyncio.to_thread(get_screening_run, run_id) is None:
+        raise HTTPException(status_code=404, detail=f"Screening run {run_id} not found.")
+
+    async def event_stream():
+        last_payload = None
+        while True:
+            run = await asyncio.to_thread(get_screening_run, run_id)
+            payload = ScreeningRunStatus.model_validate(run).model_dump_json()
+            if payload != last_payload:
+                yield f"data: {payload}\n\n"
+                last_payload = payload
+            if run.status in TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(1)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.post("/ask_rag", response_model=AnswerResponse, dependencies=[Depends(require_ready)])
 def ask_rag_question(request: QuestionRequest):
     """
     Asks a question to the RAG system about the indexed candidate resumes.
     """
     try:
-        print(f"--- Received RAG question: {request.question} ---")
-        rag_chain = create_rag_chain()
-        response = rag_chain.invoke({"input": request.question})
+        logger.info("Received RAG question: %s", request.question)
+        with span("rag.ask"):
+            rag_chain = get_rag_chain(request.filters, request.top_k, resolve_candidate_ids(request))
+            response = rag_chain.invoke({"input": request.question})
         return AnswerResponse(answer=response['answer'])
     except Exception as e:
-        print(f"An error occurred in RAG chain: {e}")
+        logger.exception("An error occurred in RAG chain: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/search_resumes", response_model=List[ResumeChunk], dependencies=[Depends(require_ready)])
+def search_resumes(request: QuestionRequest):
+    """
+    Returns the resume chunks most relevant to a question, without calling the LLM.
+    job_id and min_experience narrow the candidates before the search runs,
+    e.g. {"question": "Kubernetes", "job_id": 1} only searches the applicants of job 1.
+    """
+    try:
+        retriever = get_retriever(request.filters, request.top_k, resolve_candidate_ids(request))
+        documents = retriever.invoke(request.question)
+    except Exception as e:
+        logger.exception("An error occurred in resume search: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+    return [ResumeChunk(candidate_id=doc.metadata.get("candidate_id"), file_name=doc.metadata.get("file_name"),
+                        page=doc.metadata.get("page"), text=doc.page_content) for doc in documents]
     
-@app.post("/ask_drill_down", response_model=AnswerResponse)
+@app.post("/ask_drill_down", response_model=AnswerResponse, dependencies=[Depends(require_ready)])
 def ask_drill_down_question(request: DrillDownRequest):
     """
     Performs a RAG query on a specific provided text (e.g., a single resume).
     This allows for a "drill-down" analysis.
     """
     try:
-        print(f"--- Received drill-down question: {request.question} ---")
-        text_rag_chain = create_text_rag_chain(request.context_text)
-        response = text_rag_chain.invoke({"input": request.question})
+        logger.info("Received drill-down question: %s", request.question)
+        with span("rag.drill_down"):
+            text_rag_chain = create_text_rag_chain(request.context_text)
+            response = text_rag_chain.invoke({"input": request.question})
         return AnswerResponse(answer=response['answer'])
     except Exception as e:
-        print(f"An error occurred in drill-down chain: {e}")
+        logger.exception("An error occurred in drill-down chain: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from typing import List, Optional
 from sqlmodel import Field, SQLModel, Relationship, Column, TEXT
 from .job import Job, JobApplication
@@ -6,17 +7,45 @@ class Candidate(SQLModel, table=True):
     """Database model for a candidate's profile."""
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str  # Real name for DB purposes
-    experience_years: int
-    # In a real app, skills might be a seperate table, but a simple string is fine for now
+    experience_years: int = Field(index=True)
+    # Kept for display; searches go through the normalized CandidateSkill table
     skills_string: str
     resume_text: str = Field(sa_column=Column(TEXT))
 
     # Defines the relationship back to Job
     jobs: List[Job] = Relationship(back_populates="candidates", link_model=JobApplication)
 
+class CandidateSkill(SQLModel, table=True):
+    """Normalized, indexed skills of a candidate (one row per skill)."""
+    # skill leads the primary key, so "who knows X" is an index lookup
+    skill: str = Field(primary_key=True)
+    candidate_id: int = Field(foreign_key="candidate.id", primary_key=True, index=True)
+
+def split_skills(skills_string: str) -> List[str]:
+    """Splits a comma-separated skills string into distinct, normalized (lowercased) skills."""
+    return list(dict.fromkeys(s.strip().lower() for s in skills_string.split(",") if s.strip()))
+
 class CandidateDetails(SQLModel):
     """Pydantic-like model for structured data from LLM after screening."""
     candidate_id: Optional[str] = None
     extracted_skills: List[str]
     experience_years: int
-    pii_masked: Optional[bool] = None
\ No newline at end of file
+    pii_masked: Optional[bool] = None
+
+class IndexedCandidateDetails(SQLModel):
+    """One resume's details in a batched extraction, tagged with the resume's number in the prompt."""
+    resume_index: int = Field(description="The number of the resume these details were extracted from.")
+    extracted_skills: List[str]
+    experience_years: int
+
+class BatchedCandidateDetails(SQLModel):
+    """Data model for the LLM output of a batched extraction: one entry per resume in the prompt."""
+    candidates: List[IndexedCandidateDetails]
+
+class CandidateProfile(SQLModel, table=True):
+    """Database model caching the CandidateDetails extracted from a candidate's resume."""
+    candidate_id: int = Field(foreign_key="candidate.id", primary_key=True)
+    # SHA-256 of the resume text that was screened; a different hash means the resume changed
+    resume_hash: str
+    details_json: str = Field(sa_column=Column(TEXT))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
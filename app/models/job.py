@@ -1,10 +1,15 @@
+from datetime import datetime, timezone
 from typing import List, Optional
-from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel, Relationship, Column, TEXT
 
 # Forward reference for the linking model
 class JobApplication(SQLModel, table=True):
+    # The primary key already indexes job_id; these cover lookups by candidate and by job + status
+    __table_args__ = (Index("ix_jobapplication_job_id_status", "job_id", "status"),)
+
     job_id: Optional[int] = Field(default=None, foreign_key="job.id", primary_key=True)
-    candidate_id: Optional[int] = Field(default=None, foreign_key="candidate.id", primary_key=True)
+    candidate_id: Optional[int] = Field(default=None, foreign_key="candidate.id", primary_key=True, index=True)
     status: str = Field(default="Applied")
 
 class Job(SQLModel, table=True):
@@ -22,4 +27,29 @@ class JobDetails(SQLModel):
     job_title: str
     required_skills: List[str]
     required_experience_years: int
-    key_responsibilities: List[str]
\ No newline at end of file
+    key_responsibilities: List[str]
+
+class JobProfile(SQLModel, table=True):
+    """Database model caching the JobDetails parsed from a job's description."""
+    job_id: int = Field(foreign_key="job.id", primary_key=True)
+    # SHA-256 of the description that was parsed; a different hash means the posting was edited
+    description_hash: str
+    details_json: str = Field(sa_column=Column(TEXT))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class JobScreeningResult(SQLModel, table=True):
+    """Database model storing each applicant's latest screening outcome for a job, for incremental re-screening."""
+    job_id: int = Field(foreign_key="job.id", primary_key=True)
+    candidate_id: int = Field(foreign_key="candidate.id", primary_key=True)
+    # Hashes of the job description and resume the outcome was computed from; a different hash means it is stale
+    job_hash: str
+    resume_hash: str
+    # "ranked" (scored by the matcher) or "filtered" (removed by the pre-filter)
+    outcome: str
+    # Position in the last ranking (ranked candidates only), keeps the order of equal scores stable
+    rank: Optional[int] = None
+    score: Optional[int] = None
+    pre_score: Optional[float] = None
+    # The matcher's justification, or the pre-filter's reason
+    justification: str = Field(sa_column=Column(TEXT))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 from typing import List, Optional
 
 class CandidateScore(BaseModel):
@@ -8,7 +9,15 @@ class CandidateScore(BaseModel):
     justification: str = Field(description="A brief, 1-2 sentence justification for the assigned score.")
     full_resume_text: Optional[str] = Field(None, description="The full, original text of the candidate's resume for further analysis.")
 
+class FilteredCandidate(BaseModel):
+    """Data model for a candidate removed by the deterministic pre-filter before LLM matching."""
+    candidate_id: str = Field(description="The unique identifier for the candidate.")
+    pre_score: float = Field(description="The local pre-score, from 0.0 (no fit) to 1.0 (full fit).")
+    reason: str = Field(description="Why the candidate was not sent to the LLM matcher.")
+
 class ScreeningReport(BaseModel):
     """Data model for the final screening report."""
     job_title: str = Field(description="The title of the job being screened for.")
-    ranked_candidates: List[CandidateScore] = Field(description="An ordered list of candidates, ranked from highest to lowest score.")
\ No newline at end of file
+    ranked_candidates: List[CandidateScore] = Field(description="An ordered list of candidates, ranked from highest to lowest score.")
+    # Filled in by the pipeline, not the LLM, so it is kept out of the matcher's format instructions
+    filtered_candidates: SkipJsonSchema[List[FilteredCandidate]] = Field(default_factory=list, description="Candidates removed by the pre-filter, with the reason.")
\ No newline at end of file
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlmodel import Field, SQLModel, Column, TEXT
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+class ScreeningRunStatus(SQLModel):
+    """API model describing the progress of a background screening run."""
+    id: str = Field(primary_key=True)
+    job_id: int = Field(index=True)
+    status: str = Field(default="queued")  # queued -> running -> completed | failed
+    applicants_total: int = 0
+    applicants_screened: int = 0
+    matcher_status: str = Field(default="pending")  # pending -> running -> done
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
+
+class ScreeningRun(ScreeningRunStatus, table=True):
+    """Database model for a background screening run and its persisted report."""
+    report_json: Optional[str] = Field(default=None, sa_column=Column(TEXT))
@@ -0,0 +1,73 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from app.core.config import APPLICANT_PAGE_SIZE
+from app.models.candidate import Candidate, CandidateSkill, JobApplication
+
+def iter_job_applicants(session: Session, job_id: int, page_size: int = APPLICANT_PAGE_SIZE,
+                        exclude_statuses: Optional[List[str]] = None) -> Iterator[Candidate]:
+    """
+    Yields the applicants of a job in pages, ordered by candidate ID.
+    Uses keyset pagination on the (job_id, candidate_id) primary key instead of the
+    lazy Job.candidates relationship, so large jobs are streamed in bounded queries.
+    """
+    last_id = 0
+    while True:
+        statement = (
+            select(Candidate)
+            .join(JobApplication, JobApplication.candidate_id == Candidate.id)
+            .where(JobApplication.job_id == job_id, Candidate.id > last_id)
+            .order_by(Candidate.id)
+            .limit(page_size)
+        )
+        if exclude_statuses:
+            statement = statement.where(JobApplication.status.not_in(exclude_statuses))
+        page = session.exec(statement).all()
+        if not page:
+            return
+        yield from page
+        last_id = page[-1].id
+
+
+def get_job_applicants(session: Session, job_id: int, page_size: int = APPLICANT_PAGE_SIZE,
+                       exclude_statuses: Optional[List[str]] = None) -> List[Candidate]:
+    """Returns all applicants of a job, loaded page by page, leaving out the given application statuses."""
+    return list(iter_job_applicants(session, job_id, page_size, exclude_statuses))
+
+
+def find_candidates_with_skills(session: Session, skills: List[str], min_experience: int = 0) -> List[Candidate]:
+    """
+    Returns candidates that have all the given skills and at least min_experience years.
+    Skills are looked up in the indexed CandidateSkill table instead of a LIKE scan,
+    with one join per skill so SQLite walks the (skill, candidate_id) index directly.
+    """
+    statement = select(Candidate).where(Candidate.experience_years >= min_experience)
+    for skill in dict.fromkeys(s.strip().lower() for s in skills if s.strip()):
+        skill_row = aliased(CandidateSkill)
+        statement = statement.join(skill_row, (skill_row.candidate_id == Candidate.id) & (skill_row.skill == skill))
+    return session.exec(statement.order_by(Candidate.id)).all()
+
+
+def find_candidates_by_name(session: Session, names: Iterable[str]) -> Dict[str, Candidate]:
+    """Returns the candidates with the given names, keyed by lowercased name."""
+    lowered = {name.strip().lower() for name in names if name.strip()}
+    if not lowered:
+        return {}
+    candidates = session.exec(select(Candidate).where(func.lower(Candidate.name).in_(lowered))).all()
+    return {candidate.name.lower(): candidate for candidate in candidates}
+
+
+def find_candidate_ids(session: Session, job_id: Optional[int] = None, min_experience: Optional[int] = None) -> List[int]:
+    """
+    Returns the IDs of candidates matching structured criteria: applicants of a job
+    and/or at least min_experience years. Both are answered from indexes.
+    """
+    statement = select(Candidate.id)
+    if job_id is not None:
+        statement = statement.join(JobApplication, JobApplication.candidate_id == Candidate.id).where(JobApplication.job_id == job_id)
+    if min_experience is not None:
+        statement = statement.where(Candidate.experience_years >= min_experience)
+    return list(session.exec(statement.order_by(Candidate.id)).all())
@@ -0,0 +1,67 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.candidate import CandidateDetails, CandidateProfile
+from app.models.job import JobDetails, JobProfile
+
+def text_hash(text: str) -> str:
+    """Returns the SHA-256 hex digest of a piece of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_cached_profiles(resume_hashes: Dict[int, str]) -> Dict[int, CandidateDetails]:
+    """
+    Returns the cached CandidateDetails for each candidate whose stored resume hash
+    still matches. resume_hashes maps candidate DB IDs to the hash of their current resume.
+    """
+    if not resume_hashes:
+        return {}
+    cached = {}
+    ids = list(resume_hashes)
+    with Session(engine) as session:
+        # SQLite limits the number of bound parameters, so look up in slices
+        for start in range(0, len(ids), 500):
+            statement = select(CandidateProfile).where(CandidateProfile.candidate_id.in_(ids[start:start + 500]))
+            for row in session.exec(statement):
+                if row.resume_hash == resume_hashes[row.candidate_id]:
+                    cached[row.candidate_id] = CandidateDetails.model_validate_json(row.details_json)
+    return cached
+
+
+def store_profiles(profiles: List[Tuple[int, str, CandidateDetails]]):
+    """Upserts extracted profiles, given as (candidate DB ID, resume hash, details) tuples."""
+    if not profiles:
+        return
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        for candidate_id, resume_hash, details in profiles:
+            row = session.get(CandidateProfile, candidate_id) or CandidateProfile(candidate_id=candidate_id)
+            row.resume_hash = resume_hash
+            row.details_json = details.model_dump_json()
+            row.updated_at = now
+            session.add(row)
+        session.commit()
+
+
+def load_cached_job_details(job_id: int, description_hash: str) -> Optional[JobDetails]:
+    """Returns the cached JobDetails for a job, or None if missing or the description changed."""
+    with Session(engine) as session:
+        row = session.get(JobProfile, job_id)
+        if row is None or row.description_hash != description_hash:
+            return None
+        return JobDetails.model_validate_json(row.details_json)
+
+
+def store_job_details(job_id: int, description_hash: str, details: JobDetails):
+    """Upserts the parsed JobDetails for a job."""
+    with Session(engine) as session:
+        row = session.get(JobProfile, job_id) or JobProfile(job_id=job_id)
+        row.description_hash = description_hash
+        row.details_json = details.model_dump_json()
+        row.updated_at = datetime.now(timezone.utc)
+        session.add(row)
+        session.commit()
@@ -0,0 +1,173 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from app.core.config import RAG_TOP_K, RAG_FETCH_K, RAG_BM25_WEIGHT, RAG_RERANKER_MODEL
+from app.core.observability import span
+
+# Same token shape as the skill normalizer, so "C++", "C#" and "Node.js" stay searchable
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+STOP_WORDS = frozenset("a an and are as at be by can did do does for from has have in is it of on or "
+                       "the their to was were what which who whom with".split())
+# Constant of Reciprocal Rank Fusion; larger values flatten the weight of the top ranks
+RRF_K = 60
+
+MetadataFilter = Union[Dict[str, Any], Callable[[Dict[str, Any]], bool]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases text and splits it into search terms, dropping common stop words."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def create_filter_func(metadata_filter: MetadataFilter) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Turns a metadata filter into a predicate. Uses the FAISS store's filter syntax, so
+    {"file_name": "resume1.pdf"}, {"file_name": ["a.pdf", "b.pdf"]} and operators such as
+    {"experience_years": {"$gte": 5}} behave the same for both retrievers.
+    """
+    return FAISS._create_filter_func(metadata_filter)
+
+
+class BM25Index:
+    """Okapi BM25 over an in-memory inverted index of the vector store's chunks."""
+
+    def __init__(self, documents: List[Document], k1: float = 1.5, b: float = 0.75):
+        self.documents = documents
+        self.k1, self.b = k1, b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+        for position, document in enumerate(documents):
+            term_counts = Counter(tokenize(document.page_content))
+            self.doc_lengths.append(sum(term_counts.values()))
+            for term, term_frequency in term_counts.items():
+                self.postings[term].append((position, term_frequency))
+        n = len(documents)
+        self.avg_length = (sum(self.doc_lengths) / n) if n else 0.0
+        self.idf = {term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for term, postings in self.postings.items()}
+
+    def search(self, query: str, k: int, allowed: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """Returns up to k (position, score) pairs, best first, restricted to allowed positions if given."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for position, term_frequency in self.postings[term]:
+                if allowed is not None and position not in allowed:
+                    continue
+                length_norm = 1 - self.b + self.b * self.doc_lengths[position] / max(self.avg_length, 1e-9)
+                scores[position] += idf * term_frequency * (self.k1 + 1) / (term_frequency + self.k1 * length_norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+@lru_cache(maxsize=None)
+def get_reranker(model_name: str):
+    """Returns a local cross-encoder. sentence-transformers is only needed when re-ranking is enabled."""
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(model_name)
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Fuses BM25 keyword search with FAISS similarity search using Reciprocal Rank Fusion,
+    optionally re-ranking the fused candidates with a local cross-encoder.
+    bm25_weight=1 is pure keyword search and bm25_weight=0 pure vector search.
+    candidate_ids and metadata_filter narrow the chunks before either search runs.
+    """
+    vector_store: FAISS
+    bm25: BM25Index
+    # Chunk positions of each candidate, from the candidate_id tag of the chunks
+    candidate_positions: Dict[str, List[int]] = {}
+    k: int = RAG_TOP_K
+    fetch_k: int = RAG_FETCH_K
+    bm25_weight: float = RAG_BM25_WEIGHT
+    metadata_filter: Optional[MetadataFilter] = None
+    candidate_ids: Optional[List[str]] = None
+    reranker_model: Optional[str] = RAG_RERANKER_MODEL or None
+
+    @classmethod
+    def from_vector_store(cls, vector_store: FAISS, **kwargs) -> "HybridRetriever":
+        """Builds the BM25 index over the store's chunks, in FAISS index order."""
+        documents = [vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+                     for position in range(vector_store.index.ntotal)]
+        candidate_positions: Dict[str, List[int]] = defaultdict(list)
+        for position, document in enumerate(documents):
+            if document.metadata.get("candidate_id"):
+                candidate_positions[document.metadata["candidate_id"]].append(position)
+        return cls(vector_store=vector_store, bm25=BM25Index(documents),
+                   candidate_positions=dict(candidate_positions), **kwargs)
+
+    def _allowed_positions(self) -> Optional[Set[int]]:
+        """Returns the chunk positions that pass candidate_ids and metadata_filter, or None if unrestricted."""
+        allowed = None
+        if self.candidate_ids is not None:
+            # Looked up per candidate, so the cost follows the size of the selection, not of the corpus
+            allowed = {position for candidate_id in self.candidate_ids
+                       for position in self.candidate_positions.get(candidate_id, [])}
+        if self.metadata_filter is not None:
+            matches = create_filter_func(self.metadata_filter)
+            pool = allowed if allowed is not None else range(len(self.bm25.documents))
+            allowed = {position for position in pool if matches(self.bm25.documents[position].metadata)}
+        return allowed
+
+    def _vector_search(self, query: str, allowed: Optional[Set[int]]) -> List[int]:
+        """
+        Returns the positions of the fetch_k nearest chunks, best first.
+        With a selection, FAISS only scores the allowed vectors (an IDSelector), instead of
+        searching everything and dropping non-matching chunks afterwards.
+        """
+        vector = np.array([self.vector_store.embedding_function.embed_query(query)], dtype=np.float32)
+        if self.vector_store._normalize_L2:
+            faiss.normalize_L2(vector)
+        if allowed is None:
+            _, indices = self.vector_store.index.search(vector, min(self.fetch_k, self.vector_store.index.ntotal))
+        else:
+            selector = faiss.IDSelectorBatch(np.fromiter(allowed, dtype=np.int64, count=len(allowed)))
+            _, indices = self.vector_store.index.search(vector, min(self.fetch_k, len(allowed)),
+                                                        params=faiss.SearchParameters(sel=selector))
+        return [int(i) for i in indices[0] if i != -1]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        with span("rag.retrieve", k=self.k, filtered=self.candidate_ids is not None or self.metadata_filter is not None):
+            return self._search(query)
+
+    def _search(self, query: str) -> List[Document]:
+        if not self.bm25.documents:
+            return []
+        allowed = self._allowed_positions()
+        if allowed is not None and not allowed:
+            return []
+
+        # Reciprocal Rank Fusion: each retriever contributes weight / (RRF_K + rank)
+        fused: Dict[int, float] = defaultdict(float)
+        if self.bm25_weight > 0:
+            with span("rag.retrieve.bm25"):
+                for rank, (position, _) in enumerate(self.bm25.search(query, self.fetch_k, allowed), start=1):
+                    fused[position] += self.bm25_weight / (RRF_K + rank)
+        if self.bm25_weight < 1:
+            with span("rag.retrieve.vector"):
+                for rank, position in enumerate(self._vector_search(query, allowed), start=1):
+                    fused[position] += (1 - self.bm25_weight) / (RRF_K + rank)
+
+        ranked = sorted(fused, key=lambda position: -fused[position])
+        if self.reranker_model and ranked:
+            candidates = ranked[:self.fetch_k]
+            with span("rag.retrieve.rerank", candidates=len(candidates)):
+                scores = get_reranker(self.reranker_model).predict(
+                    [(query, self.bm25.documents[position].page_content) for position in candidates]
+                )
+            ranked = [position for _, position in sorted(zip(scores, candidates), key=lambda pair: -pair[0])]
+        return [self.bm25.documents[position] for position in ranked[:self.k]]
@@ -0,0 +1,101 @@
+import logging
+import multiprocessing
+import resource
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+logger = logging.getLogger(__name__)
+
+# Shared with the drill-down chains, so both split text the same way
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 100
+
+text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+
+def parse_pdf(file_path: str, file_hash: str) -> Dict:
+    """
+    Loads and splits a single PDF. Runs in a worker process, so it returns plain data:
+    the file name and hash, the chunk texts, metadatas and IDs, and an error message
+    instead of raising when the file cannot be read.
+    Chunk IDs are derived from the file's name and content hash, so two files with the same
+    content do not share IDs, and every chunk is tagged with the PDF's file name for metadata filters.
+    """
+    from langchain_community.document_loaders import PyPDFLoader
+
+    name = Path(file_path).name
+    try:
+        docs = text_splitter.split_documents(PyPDFLoader(file_path).load())
+    except Exception as e:
+        return {"name": name, "sha256": file_hash, "texts": [], "metadatas": [], "ids": [],
+                "error": f"{type(e).__name__}: {e}"}
+    for doc in docs:
+        doc.metadata["file_name"] = name
+    return {"name": name, "sha256": file_hash,
+            "texts": [doc.page_content for doc in docs],
+            "metadatas": [doc.metadata for doc in docs],
+            "ids": [f"{name}:{file_hash}-{i}" for i in range(len(docs))],
+            "error": None}
+
+
+def iter_parsed_pdfs(files: Iterable[Tuple[str, str]], workers: int) -> Iterator[Dict]:
+    """
+    Parses (path, sha256) pairs on a process pool and yields the results as they finish.
+    At most 2 * workers files are in flight, so memory does not grow with the number of files.
+    With workers <= 1 the files are parsed in this process.
+    Workers are spawned, not forked: this runs on the warm-up thread while the server's other
+    threads are alive, and a forked child can deadlock on a lock one of them held.
+    """
+    files = iter(files)
+    if workers <= 1:
+        for file_path, file_hash in files:
+            yield parse_pdf(file_path, file_hash)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        in_flight = set()
+        for file_path, file_hash in files:
+            in_flight.add(executor.submit(parse_pdf, file_path, file_hash))
+            if len(in_flight) >= 2 * workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in in_flight:
+            yield future.result()
+
+
+def peak_memory_mb() -> float:
+    """Returns the peak resident memory of this process in MB (Linux reports ru_maxrss in KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class IngestionStats:
+    """Counts files and chunks as they are ingested and logs progress and throughput."""
+
+    def __init__(self, total_files: int, report_every: int = 50):
+        self.total_files = total_files
+        self.report_every = report_every
+        self.files = 0
+        self.chunks = 0
+        self.failed: List[Tuple[str, str]] = []
+        self.started = time.perf_counter()
+
+    def record(self, parsed: Dict):
+        self.files += 1
+        self.chunks += len(parsed["ids"])
+        if parsed["error"]:
+            self.failed.append((parsed["name"], parsed["error"]))
+            logger.warning("Skipping unreadable PDF %s: %s", parsed["name"], parsed["error"])
+        if self.files % self.report_every == 0 or self.files == self.total_files:
+            logger.info("  %s", self.summary())
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = 1 / elapsed if elapsed > 0 else 0.0
+        return (f"{self.files}/{self.total_files} PDFs, {self.chunks} chunks in {elapsed:.1f}s "
+                f"({self.files * rate:,.1f} PDFs/s, {self.chunks * rate:,.0f} chunks/s), "
+                f"{len(self.failed)} failed, peak memory {peak_memory_mb():,.0f} MB")
@@ -0,0 +1,111 @@
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core.config import (
+    PREFILTER_MIN_SCORE, PREFILTER_TOP_N, PREFILTER_MAX_EXPERIENCE_GAP, PREFILTER_SKILL_WEIGHT,
+)
+from app.models.candidate import CandidateDetails
+from app.models.report import FilteredCandidate
+
+def normalize_skill(skill: str) -> str:
+    """Lowercases a skill and collapses punctuation and whitespace, e.g. "Node.JS " -> "node js"."""
+    return " ".join(re.findall(r"[a-z0-9+#]+", skill.lower()))
+
+
+def _skills_match(candidate_skill: str, required_skill: str) -> bool:
+    """
+    Two normalized skills match if they are equal or all words of one appear in the other,
+    so "sql" matches "strong knowledge of sql" but "java" does not match "javascript".
+    """
+    if candidate_skill == required_skill:
+        return True
+    candidate_words, required_words = set(candidate_skill.split()), set(required_skill.split())
+    if not candidate_words or not required_words:
+        return False
+    return candidate_words <= required_words or required_words <= candidate_words
+
+
+def score_candidates(required_skills: List[str], required_experience: int,
+                     candidate_profiles: List[CandidateDetails],
+                     skill_weight: float = PREFILTER_SKILL_WEIGHT) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scores all candidates at once against the job.
+    Returns (pre_scores, skill_overlap, experience_gap) arrays aligned with candidate_profiles.
+    skill_overlap is the fraction of required skills covered; experience_gap is the number
+    of missing years (0 if the requirement is met).
+    """
+    n = len(candidate_profiles)
+    required = list(dict.fromkeys(s for s in (normalize_skill(s) for s in required_skills) if s))
+
+    # 1. Skill overlap: match each distinct candidate skill against the required skills once,
+    #    then scatter the matches onto the candidates with a single vectorized OR.
+    if required and n:
+        vocabulary = {}
+        cand_idx, skill_idx = [], []
+        for i, profile in enumerate(candidate_profiles):
+            for skill in profile.extracted_skills:
+                normalized = normalize_skill(skill)
+                if normalized:
+                    cand_idx.append(i)
+                    skill_idx.append(vocabulary.setdefault(normalized, len(vocabulary)))
+        skill_matches = np.array(
+            [[_skills_match(skill, req) for req in required] for skill in vocabulary],
+            dtype=bool,
+        ).reshape(len(vocabulary), len(required))
+        covered = np.zeros((n, len(required)), dtype=bool)
+        if cand_idx:
+            np.logical_or.at(covered, np.array(cand_idx), skill_matches[np.array(skill_idx)])
+        skill_overlap = covered.mean(axis=1)
+    else:
+        # Nothing to compare against, so skills do not discriminate between candidates
+        skill_overlap = np.ones(n)
+
+    # 2. Experience gap and fit
+    experience = np.array([p.experience_years for p in candidate_profiles], dtype=float)
+    experience_gap = np.maximum(0.0, required_experience - experience)
+    experience_fit = 1.0 - np.minimum(1.0, experience_gap / max(required_experience, 1))
+
+    pre_scores = skill_weight * skill_overlap + (1.0 - skill_weight) * experience_fit
+    return pre_scores, skill_overlap, experience_gap
+
+
+def prefilter_candidates(required_skills: List[str], required_experience: int,
+                         candidate_profiles: List[CandidateDetails],
+                         min_score: float = PREFILTER_MIN_SCORE,
+                         top_n: int = PREFILTER_TOP_N,
+                         max_experience_gap: int = PREFILTER_MAX_EXPERIENCE_GAP) -> Tuple[List[CandidateDetails], List[FilteredCandidate]]:
+    """
+    Cheap local pre-scoring that runs before the LLM matcher.
+    Returns the candidates worth sending to the matcher (in their original order) and the
+    filtered-out ones, each with a deterministic reason.
+    """
+    pre_scores, skill_overlap, experience_gap = score_candidates(required_skills, required_experience, candidate_profiles)
+
+    reasons = [None] * len(candidate_profiles)
+    for i in range(len(candidate_profiles)):
+        if required_skills and skill_overlap[i] == 0:
+            reasons[i] = f"No overlap with the required skills ({', '.join(required_skills)})."
+        elif experience_gap[i] > max_experience_gap:
+            reasons[i] = (f"Has {candidate_profiles[i].experience_years} years of experience; "
+                          f"the job requires {required_experience}.")
+        elif pre_scores[i] < min_score:
+            reasons[i] = f"Pre-score {pre_scores[i]:.2f} is below the cutoff of {min_score:.2f}."
+
+    # Apply the top-N limit to the survivors, ranked by pre-score (ties keep applicant order)
+    if top_n > 0:
+        survivors = [i for i, reason in enumerate(reasons) if reason is None]
+        ranked = sorted(survivors, key=lambda i: -pre_scores[i])
+        for rank, i in enumerate(ranked[top_n:], start=top_n + 1):
+            reasons[i] = f"Ranked #{rank} by pre-score; only the top {top_n} are sent to the matcher."
+
+    kept, filtered = [], []
+    for i, profile in enumerate(candidate_profiles):
+        if reasons[i] is None:
+            kept.append(profile)
+        else:
+            filtered.append(FilteredCandidate(candidate_id=profile.candidate_id,
+                                              pre_score=round(float(pre_scores[i]), 4),
+                                              reason=reasons[i]))
+    return kept, filtered
@@ -1,78 +1,273 @@
-from langchain_community.document_loaders import PyPDFDirectoryLoader
 from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.chains import create_retrieval_chain
 from langchain_core.prompts import ChatPromptTemplate
 
+import faiss
+import hashlib
+import json
+import logging
 import os
-from dotenv import load_dotenv
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
 
-load_dotenv()
-google_api_key = os.getenv("GOOGLE_API_KEY")
+from sqlmodel import Session
+
+from app.core.config import RESUME_DATA_DIR, VECTOR_STORE_DIR, DRILL_DOWN_CACHE_SIZE, INGEST_WORKERS, INGEST_EMBED_BATCH_SIZE
+from app.core.caching import CachedEmbeddings, EmbeddingCache
+from app.core.database import read_engine
+from app.core.llm import get_chat_model, get_embedding_model, get_embedding_namespace
+from app.core.observability import registry, span
+from app.models.candidate import split_skills
+from app.services.candidate_queries import find_candidates_by_name
+from app.services.hybrid_retriever import HybridRetriever, MetadataFilter
+from app.services.pdf_ingestion import IngestionStats, iter_parsed_pdfs, text_splitter
+
+logger = logging.getLogger(__name__)
+
+DRILL_DOWN_CHAIN_LOOKUPS = registry.counter("hr_drill_down_chain_lookups_total",
+                                            "Drill-down chains reused from or added to the LRU.", ["result"])
 
 # Global vars to hold vector store and embeddings
-# This is a simple in-mem cache. In production, need to persist this.
+# The store is persisted to VECTOR_STORE_DIR and only re-embedded for changed PDFs.
 vector_store = None
 embeddings = None
+hybrid_retriever = None
+
+# File names used inside the persisted index directory.
+# FAISS.save_local writes "<name>.faiss" (the index) and "<name>.pkl" (docstore + id mapping).
+INDEX_NAME = "index"
+MANIFEST_FILE = "manifest.json"
+
+
+def get_embeddings() -> CachedEmbeddings:
+    """
+    Returns the shared embedding model, wrapped in a content-addressed cache.
+    Both the resume index and the drill-down chains use it, so a chunk that was
+    embedded once is never sent to the embedding model again.
+    """
+    global embeddings
+    if embeddings is None:
+        embeddings = CachedEmbeddings(get_embedding_model(), EmbeddingCache(), namespace=get_embedding_namespace())
+    return embeddings
+
+
+def _hash_file(file_path: Path) -> str:
+    """Returns the SHA-256 hex digest of a file's content."""
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _load_manifest(index_dir: Path) -> dict:
+    """
+    Loads the manifest that maps each indexed PDF to its content hash and chunk IDs.
+    Returns an empty manifest if none exists or the index files are missing.
+    """
+    manifest_path = index_dir / MANIFEST_FILE
+    index_files = [index_dir / f"{INDEX_NAME}.faiss", index_dir / f"{INDEX_NAME}.pkl"]
+    if not manifest_path.exists() or not all(p.exists() for p in index_files):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(index_dir: Path, manifest: dict):
+    """Writes the manifest atomically so a crash never leaves a half-written file."""
+    tmp_path = index_dir / f"{MANIFEST_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, index_dir / MANIFEST_FILE)
+
+
+def _load_persisted_store(index_dir: Path) -> FAISS:
+    """
+    Loads the persisted FAISS index and docstore into memory. This skips parsing and
+    embedding the PDFs again, but the whole index is still read into RAM.
+    """
+    index = faiss.read_index(str(index_dir / f"{INDEX_NAME}.faiss"))
+    with open(index_dir / f"{INDEX_NAME}.pkl", "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    # Chunks indexed before file_name was tagged get it from their source path
+    for document in docstore._dict.values():
+        document.metadata.setdefault("file_name", Path(document.metadata.get("source", "")).name)
+    return FAISS(get_embeddings(), index, docstore, index_to_docstore_id)
 
-def load_and_build_vector_store(directory_path: str = "data/"):
+
+def _add_chunks(store: Optional[FAISS], texts: List[str], metadatas: List[dict], ids: List[str]) -> FAISS:
+    """Embeds one batch of chunks with a single embedding call and adds it to the store (creating it if needed)."""
+    vectors = get_embeddings().embed_documents(texts)
+    if store is None:
+        return FAISS.from_embeddings(list(zip(texts, vectors)), get_embeddings(), metadatas=metadatas, ids=ids)
+    store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+    return store
+
+
+def ingest_pdfs(store: Optional[FAISS], pdf_paths: List[Path], file_hashes: dict, manifest: dict,
+                workers: int = INGEST_WORKERS, batch_size: int = INGEST_EMBED_BATCH_SIZE) -> Optional[FAISS]:
+    """
+    Streams PDFs into the store: parsing runs on a process pool, chunks are embedded and
+    added batch_size at a time, so memory stays flat however many PDFs there are.
+    Unreadable PDFs are skipped and recorded in the manifest with their error, so they are
+    only retried once the file changes. Returns the (possibly newly created) store.
+    """
+    stats = IngestionStats(total_files=len(pdf_paths))
+    texts, metadatas, ids = [], [], []
+    files = ((str(path), file_hashes[path.name]) for path in pdf_paths)
+    for parsed in iter_parsed_pdfs(files, workers=min(workers, len(pdf_paths))):
+        stats.record(parsed)
+        manifest[parsed["name"]] = {"sha256": parsed["sha256"], "chunk_ids": parsed["ids"]}
+        if parsed["error"]:
+            manifest[parsed["name"]]["error"] = parsed["error"]
+        texts.extend(parsed["texts"])
+        metadatas.extend(parsed["metadatas"])
+        ids.extend(parsed["ids"])
+        while len(texts) >= batch_size:
+            store = _add_chunks(store, texts[:batch_size], metadatas[:batch_size], ids[:batch_size])
+            del texts[:batch_size], metadatas[:batch_size], ids[:batch_size]
+    if texts:
+        store = _add_chunks(store, texts, metadatas, ids)
+
+    logger.info("Ingested %s", stats.summary())
+    for name, error in stats.failed:
+        logger.warning("  Failed: %s (%s)", name, error)
+    return store
+
+
+def load_and_build_vector_store(directory_path: str = RESUME_DATA_DIR, index_dir: str = VECTOR_STORE_DIR):
     """
-    Loads documents, splits them, creates embeddings, and builds a vector store.
+    Loads the persisted vector store and brings it up to date with the PDFs in directory_path.
+    Only added, changed or removed PDFs are (re-)embedded; an unchanged corpus is
+    loaded straight from disk.
     This function is designed to be called once during application startup.
     """
-    global vector_store, embeddings
+    global vector_store
 
     if vector_store is not None:
-        print("Vector store already loaded.")
+        logger.info("Vector store already loaded.")
         return
-    
-    print("--- Building a new vector store from PDF resumes ---")
 
-    # 1. Load documents from the specified directory
-    loader = PyPDFDirectoryLoader(directory_path)
-    documents = loader.load()
-    if not documents:
+    index_dir = Path(index_dir)
+
+    # 1. Hash every PDF in the corpus and compare against the manifest
+    pdf_paths = sorted(Path(directory_path).glob("*.pdf"))
+    if not pdf_paths:
         raise ValueError(f"No documents found in directory: {directory_path}")
-    
-    # 2. Split documents into smaller chunks
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-    docs = text_splitter.split_documents(documents)
+    current_hashes = {p.name: _hash_file(p) for p in pdf_paths}
 
-    # 3. Create embeddings
-    # Use Google's embedding model
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
+    manifest = _load_manifest(index_dir)
+    changed = [name for name, file_hash in current_hashes.items()
+               if manifest.get(name, {}).get("sha256") != file_hash]
+    removed = [name for name in manifest if name not in current_hashes]
 
-    # 4. Create the FAISS vector store from the documents and embeddings
-    vector_store = FAISS.from_documents(docs, embeddings)
+    # 2. Fast path: nothing changed, so load the existing index as is
+    if manifest and not changed and not removed:
+        vector_store = _load_persisted_store(index_dir)
+        tag_chunks_with_candidates(vector_store)
+        logger.info("Loaded persisted vector store (%d PDFs, no changes)", len(manifest))
+        return
+
+    logger.info("Updating vector store: %d added/changed, %d removed PDF(s)", len(changed), len(removed))
+    store = _load_persisted_store(index_dir) if manifest else None
+
+    # An interrupted save (index written, manifest not) leaves the two out of sync; rebuild from scratch
+    if store is not None:
+        manifest_ids = {chunk_id for entry in manifest.values() for chunk_id in entry.get("chunk_ids", [])}
+        if set(store.index_to_docstore_id.values()) != manifest_ids:
+            logger.warning("Vector store index does not match its manifest; rebuilding it from all %d PDF(s)",
+                           len(current_hashes))
+            store, manifest = None, {}
+            changed, removed = list(current_hashes), []
+
+    # 3. Drop the chunks of removed and changed PDFs
+    stale_ids = [chunk_id for name in removed + changed
+                 for chunk_id in manifest.get(name, {}).get("chunk_ids", [])]
+    if store is not None and stale_ids:
+        store.delete(stale_ids)
+    for name in removed:
+        manifest.pop(name, None)
+
+    # 4. Parse, split and embed only the added or changed PDFs
+    if changed:
+        store = ingest_pdfs(store, [Path(directory_path) / name for name in changed], current_hashes, manifest)
 
-    print("--- Vector store built successfully! ---")
+    if store is None or store.index.ntotal == 0:
+        raise ValueError(f"No documents found in directory: {directory_path}")
+
+    # 5. Persist the index and the manifest for the next startup
+    index_dir.mkdir(parents=True, exist_ok=True)
+    store.save_local(str(index_dir), index_name=INDEX_NAME)
+    _save_manifest(index_dir, manifest)
+
+    tag_chunks_with_candidates(store)
+    vector_store = store
+    logger.info("Vector store built successfully!")
 
 
-def get_retriever():
+def tag_chunks_with_candidates(store: FAISS):
     """
-    Returns a retriever object from the global vertor store.
-    Ensures the store is loaded before returning.
+    Tags every chunk with the structured fields of the candidate its resume belongs to:
+    candidate_id (e.g. "CAND_1"), experience_years and skills.
+    A PDF is linked to the candidate whose name is on the resume's first line.
+    Tags come from the database on every load and are not persisted with the index.
     """
-    global vector_store
-    if vector_store is None:
-        load_and_build_vector_store()
-    return vector_store.as_retriever()
+    # The first line of each PDF's first chunk holds the candidate's name
+    chunks_by_file = {}
+    resume_names = {}
+    for position in range(store.index.ntotal):
+        chunk_id = store.index_to_docstore_id[position]
+        document = store.docstore.search(chunk_id)
+        file_name = document.metadata.get("file_name")
+        chunks_by_file.setdefault(file_name, []).append(document)
+        if chunk_id.endswith("-0"):
+            first_line = next((line.strip() for line in document.page_content.splitlines() if line.strip()), "")
+            resume_names[file_name] = first_line
+
+    with Session(read_engine) as session:
+        candidates = find_candidates_by_name(session, resume_names.values())
+
+    tagged = 0
+    for file_name, documents in chunks_by_file.items():
+        candidate = candidates.get(resume_names.get(file_name, "").lower())
+        for document in documents:
+            for key in ("candidate_id", "experience_years", "skills"):
+                document.metadata.pop(key, None)
+            if candidate is not None:
+                document.metadata.update(candidate_id=f"CAND_{candidate.id}",
+                                         experience_years=candidate.experience_years,
+                                         skills=split_skills(candidate.skills_string))
+        tagged += candidate is not None
+    logger.info("Linked %d of %d resume PDF(s) to candidates.", tagged, len(chunks_by_file))
 
 
-def create_rag_chain():
+def get_retriever(metadata_filter: Optional[MetadataFilter] = None, top_k: Optional[int] = None,
+                  candidate_ids: Optional[List[str]] = None) -> HybridRetriever:
     """
-    Creates the conversational RAG chain for querying resumes.
+    Returns the hybrid (BM25 + vector) retriever over the global vector store.
+    Ensures the store is loaded before returning. The BM25 index is built once; a filter,
+    top_k or candidate selection returns a lightweight copy that shares it.
     """
-    llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash",
-                                 google_api_key=google_api_key,
-                                 temperature=0.1)
-    retriever = get_retriever()
+    global vector_store, hybrid_retriever
+    if vector_store is None:
+        load_and_build_vector_store()
+    if hybrid_retriever is None or hybrid_retriever.vector_store is not vector_store:
+        hybrid_retriever = HybridRetriever.from_vector_store(vector_store)
+    if metadata_filter is None and top_k is None and candidate_ids is None:
+        return hybrid_retriever
+    update = {"metadata_filter": metadata_filter, "candidate_ids": candidate_ids}
+    if top_k is not None:
+        update["k"] = top_k
+    return hybrid_retriever.model_copy(update=update)
+
 
-    # This prompt is key. It instructs the LLM on how to use the retrieved context.
-    prompt = ChatPromptTemplate.from_template("""
+# This prompt is key. It instructs the LLM on how to use the retrieved context.
+RAG_PROMPT = ChatPromptTemplate.from_template("""
     You are an expert HR assisant. Your task is to answer questions about a pool of candidates based on their resumes.
     Use the following retrieved resume context to answer the question.
     If you don't know the answer from the context provided, just say that you don't know.
@@ -87,8 +282,46 @@ def create_rag_chain():
     Answer:
     """)
 
+DRILL_DOWN_PROMPT = ChatPromptTemplate.from_template("""
+    You are an expert analyst. Use the following retrieved context to answer the question.
+    If you don't know the answer, just say that. Be concise.
+
+    Context: {context}
+    Question: {input}
+    Answer:
+    """)
+
+# Chains built once and reused across requests
+llm = None
+rag_chain = None
+rag_document_chain = None
+drill_down_document_chain = None
+
+# Bounded LRU of drill-down chains, keyed by the SHA-256 of the context text
+drill_down_chains: "OrderedDict[str, object]" = OrderedDict()
+drill_down_lock = threading.Lock()
+
+
+def get_llm():
+    """Returns the shared chat model used by both RAG chains."""
+    global llm
+    if llm is None:
+        llm = get_chat_model(temperature=0.1)
+    return llm
+
+
+def create_rag_chain(metadata_filter: Optional[MetadataFilter] = None, top_k: Optional[int] = None,
+                     candidate_ids: Optional[List[str]] = None):
+    """
+    Creates the conversational RAG chain for querying resumes.
+    """
+    global rag_document_chain
+    retriever = get_retriever(metadata_filter, top_k, candidate_ids)
+
     # This chain will take a question and the retrieved documents and generate an answer.
-    document_chain = create_stuff_documents_chain(llm, prompt)
+    if rag_document_chain is None:
+        rag_document_chain = create_stuff_documents_chain(get_llm(), RAG_PROMPT)
+    document_chain = rag_document_chain
 
     # This is the main chain that orchestrates everything.
     # It takes the user's question, passes it to the retriever to get relevant docs,
@@ -97,37 +330,59 @@ def create_rag_chain():
 
     return retrieval_chain
 
+
+def get_rag_chain(metadata_filter: Optional[MetadataFilter] = None, top_k: Optional[int] = None,
+                  candidate_ids: Optional[List[str]] = None):
+    """
+    Returns the shared RAG chain, building it on first use.
+    Called from the application lifespan so requests never pay the build cost.
+    A filter, top_k or candidate selection gets its own chain on top of the shared
+    retriever index and LLM.
+    """
+    global rag_chain
+    if metadata_filter is not None or top_k is not None or candidate_ids is not None:
+        return create_rag_chain(metadata_filter, top_k, candidate_ids)
+    if rag_chain is None:
+        rag_chain = create_rag_chain()
+    return rag_chain
+
+
 def create_text_rag_chain(text: str):
     """
-    Creates a temporary, in-memory RAG chain for a specific piece of text.
+    Returns a RAG chain for a specific piece of text.
+    Chains are kept in a bounded LRU keyed by a hash of the text, so follow-up
+    questions about the same resume skip chunking and indexing.
     """
-    print("--- Creating temporary RAG chain for specific text ---")
+    global drill_down_document_chain
+
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    with drill_down_lock:
+        if key in drill_down_chains:
+            drill_down_chains.move_to_end(key)
+            DRILL_DOWN_CHAIN_LOOKUPS.inc(result="hit")
+            return drill_down_chains[key]
 
-    # 1. Split the provided text into chunks
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-    docs = text_splitter.create_documents([text]) # create_documents expects a list
+    DRILL_DOWN_CHAIN_LOOKUPS.inc(result="miss")
+    logger.debug("Creating temporary RAG chain for specific text")
 
-    # 2. Create embeddings
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
-    
-    # 3. Create a temporary, in-memory vector store from this one document
-    temp_vector_store = FAISS.from_documents(docs, embeddings)
+    with span("rag.drill_down_index", characters=len(text)):
+        # 1. Split the provided text into chunks
+        docs = text_splitter.create_documents([text]) # create_documents expects a list
+
+        # 2. Create a temporary, in-memory vector store from this one document
+        # Embeddings come from the shared cache, so a resume seen before is not re-embedded
+        temp_vector_store = FAISS.from_documents(docs, get_embeddings())
     temp_retriever = temp_vector_store.as_retriever()
 
-    # 4. Use the same prompt and LLM as our other RAG chain
-    llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash",
-                                 google_api_key=google_api_key,
-                                 temperature=0.1)
-    prompt = ChatPromptTemplate.from_template("""
-    You are an expert analyst. Use the following retrieved context to answer the question.
-    If you don't know the answer, just say that. Be concise.
+    # 3. Reuse the shared LLM and drill-down prompt
+    if drill_down_document_chain is None:
+        drill_down_document_chain = create_stuff_documents_chain(get_llm(), DRILL_DOWN_PROMPT)
+    retrieval_chain = create_retrieval_chain(temp_retriever, drill_down_document_chain)
 
-    Context: {context}
-    Question: {input}
-    Answer:
-    """)
-    
-    document_chain = create_stuff_documents_chain(llm, prompt)
-    retrieval_chain = create_retrieval_chain(temp_retriever, document_chain)
-    
-    return retrieval_chain
\ No newline at end of file
+    with drill_down_lock:
+        drill_down_chains[key] = retrieval_chain
+        drill_down_chains.move_to_end(key)
+        while len(drill_down_chains) > DRILL_DOWN_CACHE_SIZE:
+            drill_down_chains.popitem(last=False)
+
+    return retrieval_chain
@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from app.core.config import (
+    SCREENING_RUN_WORKERS, SCREENING_RUN_QUEUE_LIMIT, SCREENING_RUN_PROGRESS_INTERVAL_SECONDS, SCREENING_INCREMENTAL,
+)
+from app.core.database import engine, read_engine
+from app.core.observability import registry
+from app.models.report import ScreeningReport
+from app.models.screening_run import ScreeningRun, utcnow
+from app.services.screening_services import run_screening_pipeline_for_job
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "failed"}
+
+class ScreeningQueueFullError(Exception):
+    """Raised when too many screening runs are already queued or running."""
+
+
+# Bounded background executor shared by all screening runs
+executor = ThreadPoolExecutor(max_workers=SCREENING_RUN_WORKERS, thread_name_prefix="screening-run")
+active_runs = 0
+active_runs_lock = threading.Lock()
+
+SCREENING_RUNS = registry.gauge("hr_screening_runs", "Background screening runs of this process, by state.", ["state"])
+SCREENING_RUN_OUTCOMES = registry.counter("hr_screening_run_outcomes_total", "Finished background screening runs.",
+                                          ["status"])
+
+
+def _update_run(run_id: str, **fields):
+    """Applies field updates to a persisted run."""
+    with Session(engine) as session:
+        run = session.get(ScreeningRun, run_id)
+        if run is None:
+            return
+        for name, value in fields.items():
+            setattr(run, name, value)
+        run.updated_at = utcnow()
+        session.add(run)
+        session.commit()
+
+
+class _ProgressWriter:
+    """
+    Persists the progress of a run without one write per screened applicant: counters are
+    collected and written at most every interval seconds, while stage changes (matcher_status)
+    are written at once. Called from the pipeline's worker threads.
+    """
+
+    def __init__(self, run_id: str, interval: float = SCREENING_RUN_PROGRESS_INTERVAL_SECONDS):
+        self.run_id = run_id
+        self.interval = interval
+        self._pending = {}
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, **progress):
+        with self._lock:
+            self._pending.update(progress)
+            if "matcher_status" in progress or time.monotonic() - self._last_write >= self.interval:
+                self._flush()
+
+    def flush(self, **fields):
+        """Writes the pending progress together with fields (e.g. the final status)."""
+        with self._lock:
+            self._pending.update(fields)
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            _update_run(self.run_id, **self._pending)
+            self._pending = {}
+            self._last_write = time.monotonic()
+
+
+def _execute_run(run_id: str, job_id: int, incremental: bool):
+    """Runs the screening pipeline for a queued run and persists the outcome."""
+    global active_runs
+    SCREENING_RUNS.dec(state="queued")
+    SCREENING_RUNS.inc(state="running")
+    status = "failed"
+    progress = _ProgressWriter(run_id)
+    try:
+        _update_run(run_id, status="running")
+        report = run_screening_pipeline_for_job(job_id, progress_callback=progress, incremental=incremental)
+        if report is None:
+            progress.flush(status="failed",
+                           error=f"No report generated. Job ID {job_id} might not have applicants or exist.")
+        else:
+            progress.flush(status="completed", report_json=report.model_dump_json())
+            status = "completed"
+    except Exception as e:
+        logger.exception("Screening run %s failed: %s", run_id, e)
+        progress.flush(status="failed", error=str(e))
+    finally:
+        SCREENING_RUNS.dec(state="running")
+        SCREENING_RUN_OUTCOMES.inc(status=status)
+        with active_runs_lock:
+            active_runs -= 1
+
+
+def submit_screening_run(job_id: int, incremental: bool = SCREENING_INCREMENTAL) -> ScreeningRun:
+    """
+    Queues a screening run for a job and returns immediately.
+    The run executes on the bounded background executor.
+    """
+    global active_runs
+    with active_runs_lock:
+        if active_runs >= SCREENING_RUN_QUEUE_LIMIT:
+            raise ScreeningQueueFullError(f"Too many screening runs in progress (limit {SCREENING_RUN_QUEUE_LIMIT}).")
+        active_runs += 1
+
+    run, queued = None, False
+    try:
+        run = ScreeningRun(id=uuid.uuid4().hex, job_id=job_id)
+        with Session(engine) as session:
+            session.add(run)
+            session.commit()
+            session.refresh(run)
+        SCREENING_RUNS.inc(state="queued")
+        queued = True
+        executor.submit(_execute_run, run.id, job_id, incremental)
+    except Exception as e:
+        # The run never reached the executor, so its slot would otherwise never be released
+        with active_runs_lock:
+            active_runs -= 1
+        if queued:
+            SCREENING_RUNS.dec(state="queued")
+            _update_run(run.id, status="failed", error=f"Could not queue the run: {e}")
+        raise
+    logger.info("Queued screening run %s for job_id %s", run.id, job_id)
+    return run
+
+
+def get_screening_run(run_id: str) -> Optional[ScreeningRun]:
+    """Returns a persisted run, or None if it does not exist."""
+    with Session(read_engine) as session:
+        return session.get(ScreeningRun, run_id)
+
+
+def get_screening_run_report(run: ScreeningRun) -> Optional[ScreeningReport]:
+    """Returns the persisted report of a completed run."""
+    if run.report_json is None:
+        return None
+    return ScreeningReport.model_validate_json(run.report_json)
+
+
+def fail_interrupted_runs():
+    """
+    Marks runs left queued or running by a previous process as failed.
+    Called at startup, since their executor died with that process.
+    """
+    with Session(engine) as session:
+        runs = session.exec(select(ScreeningRun).where(ScreeningRun.status.not_in(TERMINAL_STATUSES))).all()
+        for run in runs:
+            run.status = "failed"
+            run.error = "Interrupted by a server restart."
+            run.updated_at = utcnow()
+            session.add(run)
+        session.commit()
+
+
+def shutdown_screening_runs():
+    """Stops accepting work and cancels runs that have not started yet."""
+    executor.shutdown(wait=False, cancel_futures=True)
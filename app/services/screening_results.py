@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.job import JobScreeningResult
+from app.models.report import CandidateScore, FilteredCandidate, ScreeningReport
+
+def candidate_db_id(candidate_id: str) -> int:
+    """Turns a report candidate ID ("CAND_12") back into the candidate's DB ID (-1 if it is not one)."""
+    db_id = candidate_id.removeprefix("CAND_")
+    return int(db_id) if db_id.isdigit() else -1
+
+
+def load_screening_results(job_id: int, job_hash: str) -> Dict[int, JobScreeningResult]:
+    """
+    Returns the stored outcome of every candidate screened for a job, keyed by candidate DB ID.
+    Outcomes computed for a different version of the job description are left out.
+    """
+    with Session(engine) as session:
+        rows = session.exec(select(JobScreeningResult).where(JobScreeningResult.job_id == job_id,
+                                                             JobScreeningResult.job_hash == job_hash)).all()
+    return {row.candidate_id: row for row in rows}
+
+
+def store_screening_results(job_id: int, job_hash: str, report: ScreeningReport, resume_hashes: Dict[int, str]):
+    """
+    Stores the outcome of every candidate in the report (their rank and score, or the
+    pre-filter's reason), replacing their previous outcomes for this job.
+    Rows of candidates missing from the report (e.g. rejected since) are kept, so they
+    are not screened again if they come back.
+    """
+    outcomes: Dict[int, dict] = {}
+    for rank, score in enumerate(report.ranked_candidates):
+        outcomes.setdefault(candidate_db_id(score.candidate_id), {"outcome": "ranked", "rank": rank, "score": score.score,
+                                                                  "justification": score.justification})
+    for filtered in report.filtered_candidates:
+        outcomes.setdefault(candidate_db_id(filtered.candidate_id), {"outcome": "filtered", "pre_score": filtered.pre_score,
+                                                                     "justification": filtered.reason})
+    # Only applicants of this run are stored, never IDs the matcher made up
+    now = datetime.now(timezone.utc)
+    rows = [JobScreeningResult(job_id=job_id, candidate_id=candidate_id, job_hash=job_hash,
+                               resume_hash=resume_hashes[candidate_id], updated_at=now, **fields)
+            for candidate_id, fields in outcomes.items() if candidate_id in resume_hashes]
+    if not rows:
+        return
+    ids = [row.candidate_id for row in rows]
+    with Session(engine) as session:
+        # SQLite limits the number of bound parameters, so delete in slices
+        for start in range(0, len(ids), 500):
+            session.execute(delete(JobScreeningResult).where(JobScreeningResult.job_id == job_id,
+                                                          JobScreeningResult.candidate_id.in_(ids[start:start + 500])))
+        session.add_all(rows)
+        session.commit()
+
+
+def results_to_scores(results: List[JobScreeningResult]) -> List[CandidateScore]:
+    """Returns the ranked outcomes as CandidateScores, in their stored rank order."""
+    ranked = sorted((row for row in results if row.outcome == "ranked"), key=lambda row: row.rank)
+    return [CandidateScore(candidate_id=f"CAND_{row.candidate_id}", score=row.score, justification=row.justification)
+            for row in ranked]
+
+
+def results_to_filtered(results: List[JobScreeningResult]) -> List[FilteredCandidate]:
+    """Returns the filtered outcomes as FilteredCandidates."""
+    return [FilteredCandidate(candidate_id=f"CAND_{row.candidate_id}", pre_score=row.pre_score, reason=row.justification)
+            for row in results if row.outcome == "filtered"]
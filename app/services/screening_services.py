@@ -1,12 +1,44 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
 from sqlmodel import Session, select
+from app.core.config import (
+    SCREENING_CONCURRENCY, SCREENING_BATCH_SIZE, SCREENING_EXCLUDED_STATUSES, SCREENING_INCREMENTAL,
+    BATCH_SCREENING_JOB_CONCURRENCY, MATCHING_MODE, MATCHER_BATCH_SIZE, MATCHER_TOP_K, PREFILTER_ENABLED,
+)
 from app.core.database import engine
-from app.models.job import Job, JobDetails
+from app.core.observability import registry, setup_logging, span, submit_in_context
+from app.models.job import Job, JobDetails, JobScreeningResult
 from app.models.candidate import Candidate, CandidateDetails
 
 # Import all agents
 from app.agents.job_parser import job_parser_agent
-from app.agents.resume_screener import resume_screener_agent
-from app.agents.candidate_matcher import candidate_matcher_agent
+from app.agents.resume_screener import extract_candidate_details, extract_candidate_details_batch
+from app.agents.candidate_matcher import candidate_matcher_agent, hierarchical_candidate_matcher_agent, rerank_finalists
+from app.models.report import CandidateScore, ScreeningReport
+from app.services.candidate_queries import get_job_applicants
+from app.services.prefilter import prefilter_candidates
+from app.services.semantic_ranking import semantic_candidate_matcher
+from app.services.screening_results import (
+    load_screening_results, results_to_filtered, results_to_scores, store_screening_results,
+)
+from app.services.extraction_cache import (
+    load_cached_profiles, store_profiles, load_cached_job_details, store_job_details, text_hash,
+)
+from app.utils.pii_masker import mask_pii_batch
+from app.utils.retry import call_with_backoff
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_CACHE_LOOKUPS = registry.counter("hr_extraction_cache_lookups_total",
+                                            "Stored job details and candidate profiles reused or recomputed.",
+                                            ["kind", "result"])
+SCREENING_CANDIDATES = registry.counter("hr_screening_candidates_total",
+                                        "Applicants processed by the screening pipeline, by outcome.", ["outcome"])
+SCREENING_PENDING_BATCHES = registry.gauge("hr_screening_pending_batches",
+                                           "Resume batches waiting for or running their extraction call.")
 
 
 # # --- MOCK DATA ---
@@ -73,75 +105,412 @@ from app.agents.candidate_matcher import candidate_matcher_agent
 
 #     print("\nPipeline finished (for now).")
 
-def run_screening_pipeline_for_job(job_id: int):
+def build_job_description(job: Job) -> str:
+    """Builds the job description text handed to the job parser."""
+    # In a real app, the job description would be stored in the DB.
+    return f"Title: {job.title}. Required Experience: {job.experience_years_required} years."
+
+
+def parse_job(job: Job) -> JobDetails:
+    """
+    Returns the structured JobDetails for a job.
+    Parsed details are stored keyed by a hash of the description, so the parser
+    LLM only runs again when the posting is edited.
+    """
+    description = build_job_description(job)
+    description_hash = text_hash(description)
+    parsed_job_details = load_cached_job_details(job.id, description_hash)
+    if parsed_job_details is not None:
+        EXTRACTION_CACHE_LOOKUPS.inc(kind="job", result="hit")
+        logger.info("Reusing cached job details for '%s'.", job.title)
+        return parsed_job_details
+
+    EXTRACTION_CACHE_LOOKUPS.inc(kind="job", result="miss")
+
+    parsed_job_details = job_parser_agent(description)
+    # Can override the LLM's parsed title with the one from our DB for consistency
+    parsed_job_details.job_title = job.title
+    store_job_details(job.id, description_hash, parsed_job_details)
+    return parsed_job_details
+
+
+def build_resume_text(applicant: Candidate) -> str:
+    """Builds the resume text handed to the screener for a DB applicant."""
+    # In a real app, full resume text would be stored in DB.
+    return f"Name: {applicant.name}. Experience: {applicant.experience_years} years. Skills: {applicant.skills_string}"
+
+
+def _screen_one(candidate_db_id: int, masked_resume_text: str) -> Optional[CandidateDetails]:
+    """
+    Extracts the profile from a single masked resume, retrying with backoff if the LLM is rate limited.
+    Returns None instead of raising, so one bad resume cannot fail the whole job.
+    """
+    try:
+        profile = call_with_backoff(extract_candidate_details, masked_resume_text)
+    except Exception as e:
+        logger.warning("Screening failed for candidate %s: %s", candidate_db_id, e)
+        return None
+    profile.candidate_id = f"CAND_{candidate_db_id}"  # Use DB ID for consistency
+    return profile
+
+
+def _screen_batch(batch: List[Tuple[int, str]]) -> List[Optional[CandidateDetails]]:
+    """
+    Extracts the profiles of several masked resumes with one LLM call.
+    Resumes the batched call could not parse (or the whole batch, if the call fails)
+    fall back to one call per resume.
+    """
+    with span("screening.extract_batch", resumes=len(batch)) as attributes:
+        if len(batch) == 1:
+            return [_screen_one(*batch[0])]
+        try:
+            profiles = call_with_backoff(extract_candidate_details_batch, [text for _, text in batch])
+        except Exception as e:
+            logger.warning("Batched screening failed for %d candidates, retrying one by one: %s", len(batch), e)
+            profiles = [None] * len(batch)
+        attributes["retried"] = sum(profile is None for profile in profiles)
+
+        results = []
+        for (candidate_db_id, masked_resume_text), profile in zip(batch, profiles):
+            if profile is None:
+                profile = _screen_one(candidate_db_id, masked_resume_text)
+            else:
+                profile.candidate_id = f"CAND_{candidate_db_id}"
+            results.append(profile)
+        return results
+
+
+def screen_applicants(applicants: List[Candidate],
+                      max_concurrency: int = SCREENING_CONCURRENCY,
+                      batch_size: int = SCREENING_BATCH_SIZE,
+                      on_progress: Optional[Callable[[int, int], None]] = None,
+                      on_profile: Optional[Callable[[CandidateDetails], None]] = None) -> List[Optional[CandidateDetails]]:
+    """
+    Screens applicants concurrently on a bounded thread pool, batch_size resumes per LLM call.
+    Profiles extracted earlier from the same resume text are reused from the database,
+    so only new or changed resumes reach the screener.
+    Results are returned in applicant order; failed applicants are None.
+    on_progress, if given, is called with (screened, total) as each applicant finishes.
+    on_profile, if given, is called with each profile as soon as it is available.
+    """
+    # Read everything we need from the ORM objects up front, the workers never touch the session
+    jobs = [(applicant.id, build_resume_text(applicant)) for applicant in applicants]
+    resume_hashes = {candidate_id: text_hash(resume_text) for candidate_id, resume_text in jobs}
+    cached = load_cached_profiles(resume_hashes)
+
+    results: List[Optional[CandidateDetails]] = [None] * len(jobs)
+    pending = []
+    for i, (candidate_id, resume_text) in enumerate(jobs):
+        if candidate_id in cached:
+            results[i] = cached[candidate_id]
+            if on_profile:
+                on_profile(results[i])
+        else:
+            pending.append(i)
+    screened = len(jobs) - len(pending)
+    EXTRACTION_CACHE_LOOKUPS.inc(screened, kind="profile", result="hit")
+    EXTRACTION_CACHE_LOOKUPS.inc(len(pending), kind="profile", result="miss")
+    if cached:
+        logger.info("Reusing %d cached candidate profile(s).", screened)
+        if on_progress:
+            on_progress(screened, len(jobs))
+
+    # Mask PII for all remaining resumes in one batch, then extract profiles concurrently
+    with span("screening.mask", resumes=len(pending)):
+        masked_texts = mask_pii_batch([jobs[i][1] for i in pending])
+    batch_size = max(1, batch_size)
+    batches = [list(zip(pending[start:start + batch_size], masked_texts[start:start + batch_size]))
+               for start in range(0, len(pending), batch_size)]
+    with span("screening.extract", resumes=len(pending), batches=len(batches)), \
+            ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        SCREENING_PENDING_BATCHES.inc(len(batches))
+        futures = {submit_in_context(executor, _screen_batch, [(jobs[i][0], masked) for i, masked in batch]): batch
+                   for batch in batches}
+        for future in as_completed(futures):
+            SCREENING_PENDING_BATCHES.dec()
+            for (i, _), profile in zip(futures[future], future.result()):
+                results[i] = profile
+                if on_profile and profile is not None:
+                    on_profile(profile)
+                screened += 1
+                if on_progress:
+                    on_progress(screened, len(jobs))
+
+    store_profiles([(jobs[i][0], resume_hashes[jobs[i][0]], results[i]) for i in pending if results[i] is not None])
+    return results
+
+
+def match_candidates(job_details: JobDetails, candidate_profiles: List[CandidateDetails],
+                     mode: str = MATCHING_MODE) -> ScreeningReport:
+    """
+    Ranks candidates with the configured matching mode.
+    "auto" uses a single prompt for small pools and the hierarchical matcher for large ones;
+    "vector" shortlists the top-K by embedding similarity and only ranks those, with the LLM.
+    """
+    if mode == "auto":
+        mode = "hierarchical" if len(candidate_profiles) > MATCHER_BATCH_SIZE else "single"
+    if mode == "hierarchical":
+        return hierarchical_candidate_matcher_agent(job_details, candidate_profiles)
+    if mode == "single":
+        return candidate_matcher_agent(job_details, candidate_profiles)
+    if mode == "vector":
+        return semantic_candidate_matcher(job_details, candidate_profiles)
+    raise ValueError(f"Unknown matching mode: {mode}")
+
+
+def merge_rankings(job_details: JobDetails, stored_scores: List[CandidateScore], new_scores: List[CandidateScore],
+                   profiles: Dict[str, CandidateDetails], top_k: int = MATCHER_TOP_K) -> List[CandidateScore]:
+    """
+    Inserts newly matched candidates into a stored ranking. Both lists keep their own order
+    (a stored ranking is re-ranked finalists followed by the batch-scored tail, so it is not
+    sorted by score): a new candidate goes in front of the first stored candidate it outscores.
+    If new candidates reach the top-K, the top-K are re-ranked together in one matcher call,
+    as in the hierarchical matcher, so their scores stay comparable. profiles maps candidate IDs
+    to their profiles; the re-rank is skipped if a finalist's profile is not available.
+    """
+    merged, i, j = [], 0, 0
+    while i < len(stored_scores) or j < len(new_scores):
+        if j < len(new_scores) and (i == len(stored_scores) or new_scores[j].score > stored_scores[i].score):
+            merged.append(new_scores[j])
+            j += 1
+        else:
+            merged.append(stored_scores[i])
+            i += 1
+    new_ids = {score.candidate_id for score in new_scores}
+    finalists = merged[:top_k]
+    if (stored_scores and len(finalists) > 1 and any(score.candidate_id in new_ids for score in finalists)
+            and all(score.candidate_id in profiles for score in finalists)):
+        with span("screening.rerank", candidates=len(finalists)):
+            finalists = rerank_finalists(job_details, finalists, list(profiles.values()))
+    return finalists + merged[top_k:]
+
+
+def _load_stored_profiles(results: List[JobScreeningResult]) -> Dict[str, CandidateDetails]:
+    """Returns the extracted profiles of candidates with a stored outcome, keyed by candidate ID (CAND_<id>)."""
+    cached = load_cached_profiles({row.candidate_id: row.resume_hash for row in results})
+    profiles = {}
+    for candidate_id, profile in cached.items():
+        profile.candidate_id = f"CAND_{candidate_id}"
+        profiles[profile.candidate_id] = profile
+    return profiles
+
+
+def run_screening_pipeline_for_job(job_id: int, progress_callback: Optional[Callable[..., None]] = None,
+                                   event_callback: Optional[Callable[[str, BaseModel], None]] = None,
+                                   include_resume_text: bool = True, incremental: bool = SCREENING_INCREMENTAL,
+                                   screened_profiles: Optional[Dict[int, Optional[CandidateDetails]]] = None):
     """
     Runs the full screening pipeline for a specific job ID from the database.
+    progress_callback, if given, is called with keyword arguments describing the
+    current stage (applicants_total, applicants_screened, matcher_status).
+    event_callback, if given, is called with ("candidate", CandidateDetails) as each
+    applicant is screened, then ("filtered", FilteredCandidate) and ("score", CandidateScore)
+    in rank order once matching is done.
+    include_resume_text=False leaves full_resume_text out of the report; clients fetch it on demand.
+
+    Every run stores each candidate's outcome; with incremental=True, applicants whose resume
+    and job description are unchanged keep their stored outcome, and only new or changed
+    applicants are screened, pre-filtered and matched, then merged into the stored ranking.
+    Incremental runs also leave out applicants whose application status is in
+    SCREENING_EXCLUDED_STATUSES (e.g. "Rejected"); full runs screen every applicant.
+    screened_profiles, if given, maps candidate DB IDs to profiles (None if screening failed)
+    already extracted for this run; those applicants are not masked or extracted again.
     """
-    print(f"\n{'='*20} STARTING PIPELINE FOR JOB ID: {job_id} {'='*20}")
+    def report_progress(**progress):
+        if progress_callback:
+            progress_callback(**progress)
+
+    def emit(event: str, payload: BaseModel):
+        if event_callback:
+            event_callback(event, payload)
 
-    with Session(engine) as session:
+    logger.info("Starting %s screening pipeline for job %s", "incremental" if incremental else "full", job_id)
+
+    with span("screening.pipeline", job_id=job_id, incremental=incremental) as pipeline_attributes, Session(engine) as session:
         # --- Step 1: Fetch Job and its Applicants from DB ---
-        job = session.get(Job, job_id)
+        with span("screening.fetch", job_id=job_id) as attributes:
+            job = session.get(Job, job_id)
+            exclude_statuses = SCREENING_EXCLUDED_STATUSES if incremental else None
+            applicants = get_job_applicants(session, job_id, exclude_statuses=exclude_statuses) if job else []
+            attributes["applicants"] = len(applicants)
         if not job:
-            print(f"Error: Job with ID {job_id} not found.")
+            logger.error("Job with ID %s not found.", job_id)
             return
-        
-        applicants = job.candidates
         if not applicants:
-            print(f"No applicants found for job '{job.title}'.")
+            logger.warning("No applicants found for job '%s'.", job.title)
             return
-        
-        print(f"Found job: '{job.title}' with {len(applicants)} applicant(s).")
 
-        # --- Step 2: Parse Job Description ---
-        # In a real app, the job description would be stored in the DB.
-        mock_job_description_text = f"Title: {job.title}. Required Experience: {job.experience_years_required} years."
-        # Can add more details here if needed
-        parsed_job_details = job_parser_agent(mock_job_description_text)
-        # Can override the LLM's parsed title with the one from our DB for consistency
-        parsed_job_details.job_title = job.title
+        logger.info("Found job '%s' with %d applicant(s).", job.title, len(applicants))
+        pipeline_attributes["applicants"] = len(applicants)
+
+        # --- Step 2: Parse Job Description (cached until the posting changes) ---
+        with span("screening.parse_job", job_id=job_id):
+            parsed_job_details = parse_job(job)
+        job_hash = text_hash(build_job_description(job))
 
+        # --- Step 3: Keep the stored outcomes of unchanged applicants (incremental mode) ---
+        resume_hashes = {applicant.id: text_hash(build_resume_text(applicant)) for applicant in applicants}
+        stored = load_screening_results(job_id, job_hash) if incremental else {}
+        reused = [stored[applicant.id] for applicant in applicants
+                  if applicant.id in stored and stored[applicant.id].resume_hash == resume_hashes[applicant.id]]
+        reused_ids = {row.candidate_id for row in reused}
+        to_screen = [applicant for applicant in applicants if applicant.id not in reused_ids]
+        SCREENING_CANDIDATES.inc(len(reused), outcome="reused")
+        if incremental:
+            logger.info("Reusing %d stored outcome(s); %d new or changed applicant(s) to screen.", len(reused), len(to_screen))
+        report_progress(applicants_total=len(applicants), applicants_screened=len(reused))
 
-        # --- Step 3: Screen each Applicant's Profile ---
+        # --- Step 4: Screen each new or changed Applicant's Profile ---
+        # Resumes are PII-masked in bulk, then parsed concurrently; failed ones are skipped.
+        logger.info("Screening %d applicant(s) (concurrency: %d, batch size: %d)...",
+                    len(to_screen), SCREENING_CONCURRENCY, SCREENING_BATCH_SIZE)
         all_candidate_profiles = []
-        print("\n--- Screening all applicants... ---")
-        for applicant in applicants:
-            # In a real app, full resume text would be stored in DB.
-            mock_resume_text = f"Name: {applicant.name}. Experience: {applicant.experience_years} years. Skills: {applicant.skills_string}"
+        with span("screening.screen", applicants=len(to_screen)) as attributes:
+            # Profiles already extracted by a batch run over several jobs are not screened again
+            known = screened_profiles or {}
+            missing = [applicant for applicant in to_screen if applicant.id not in known]
+            already_screened = len(reused) + len(to_screen) - len(missing)
+            extracted = dict(zip((applicant.id for applicant in missing), screen_applicants(
+                missing,
+                on_progress=lambda screened, total: report_progress(applicants_screened=already_screened + screened),
+                on_profile=lambda profile: emit("candidate", profile),
+            ))) if missing else {}
+            profiles = []
+            for applicant in to_screen:
+                if applicant.id in known:
+                    profiles.append(known[applicant.id])
+                    if known[applicant.id] is not None:
+                        emit("candidate", known[applicant.id])
+                else:
+                    profiles.append(extracted[applicant.id])
+            for applicant, profile in zip(to_screen, profiles):
+                if profile is None:
+                    logger.warning("Skipping %s: screening failed.", applicant.name)
+                    continue
+                all_candidate_profiles.append(profile)
+                logger.debug("Processed profile for %s (ID: %s)", applicant.name, profile.candidate_id)
+            attributes["failed"] = len(to_screen) - len(all_candidate_profiles)
+        SCREENING_CANDIDATES.inc(len(all_candidate_profiles), outcome="screened")
+        SCREENING_CANDIDATES.inc(len(to_screen) - len(all_candidate_profiles), outcome="failed")
 
-            # The resume_screener_agent already handles PII masking and parsing
-            # For this DB-driven flow, we can create the CandidateDetails directly
-            # to save on LLM calls, but we'll run the agent to test the full flow.
+        if not all_candidate_profiles and not reused:
+            logger.warning("No applicants could be screened for job '%s'.", job.title)
+            return
+        new_profiles = {profile.candidate_id: profile for profile in all_candidate_profiles}
 
-            # Using the agent to simulate the full flow
-            profile = resume_screener_agent(mock_resume_text)
-            profile.candidate_id = f"CAND_{applicant.id}"  # Use DB ID for consistency
+        # --- Step 5: Pre-filter candidates before spending LLM tokens ---
+        filtered_candidates = []
+        if PREFILTER_ENABLED and all_candidate_profiles:
+            with span("screening.prefilter", candidates=len(all_candidate_profiles)) as attributes:
+                all_candidate_profiles, filtered_candidates = prefilter_candidates(
+                    parsed_job_details.required_skills, job.experience_years_required, all_candidate_profiles
+                )
+                attributes["filtered"] = len(filtered_candidates)
+            SCREENING_CANDIDATES.inc(len(filtered_candidates), outcome="filtered")
+            logger.info("Pre-filter kept %d candidate(s), filtered out %d.",
+                        len(all_candidate_profiles), len(filtered_candidates))
 
-            all_candidate_profiles.append(profile)
-            print(f"Processed profile for {applicant.name} (ID: {profile.candidate_id})")
+        # --- Step 6: Run the Matching Agent to get the final report ---
+        logger.info("Generating final screening report...")
+        with span("screening.match", candidates=len(all_candidate_profiles)):
+            if all_candidate_profiles:
+                report_progress(matcher_status="running")
+                final_report = match_candidates(parsed_job_details, all_candidate_profiles)
+            else:
+                final_report = ScreeningReport(job_title=job.title, ranked_candidates=[])
+        SCREENING_CANDIDATES.inc(len(final_report.ranked_candidates), outcome="ranked")
+        # The vector matcher reports the candidates it left outside its shortlist as filtered
+        final_report.filtered_candidates = filtered_candidates + final_report.filtered_candidates
 
-        
-        # --- Step 4: Run the Matching Agent to get the final report ---
-        print("\n--- Generating final screening report... ---")
-        final_report = candidate_matcher_agent(parsed_job_details, all_candidate_profiles)
+        # Merge the new outcomes into the stored ones, then store the outcome of every candidate
+        if reused:
+            with span("screening.merge", reused=len(reused), new=len(final_report.ranked_candidates)):
+                stored_scores = results_to_scores(reused)
+                if final_report.ranked_candidates:
+                    new_profiles.update(_load_stored_profiles([row for row in reused if row.outcome == "ranked"]))
+                final_report.ranked_candidates = merge_rankings(parsed_job_details, stored_scores,
+                                                                final_report.ranked_candidates, new_profiles)
+                final_report.filtered_candidates = results_to_filtered(reused) + final_report.filtered_candidates
+        store_screening_results(job_id, job_hash, final_report, resume_hashes)
+        report_progress(matcher_status="done")
+        for filtered_candidate in final_report.filtered_candidates:
+            emit("filtered", filtered_candidate)
+        for ranked_candidate in final_report.ranked_candidates:
+            emit("score", ranked_candidate)
 
-        # --- Step 5: Enrich the report with full resume text from DB ---
-        print("Enriching report with full resume text...")
-        # Create a mapping from candidate_id (CAND_1) to the full DB object
-        applicant_map = {f"CAND_{app.id}": app for app in applicants}
+        # --- Step 7: Enrich the report with full resume text from DB ---
+        if not include_resume_text:
+            logger.info("Final report for '%s' is ready (resume text omitted).", job.title)
+            return final_report
+        with span("screening.enrich", candidates=len(final_report.ranked_candidates)):
+            # Create a mapping from candidate_id (CAND_1) to the full DB object
+            applicant_map = {f"CAND_{app.id}": app for app in applicants}
 
-        for ranked_candidate in final_report.ranked_candidates:
-            # Look up the original applicant from the DB
-            original_applicant = applicant_map.get(ranked_candidate.candidate_id)
-            if original_applicant:
-                # Add their full resume text to the report
-                ranked_candidate.full_resume_text = original_applicant.resume_text
-
-        # --- Step 6: Print the final report ---
-        print(f"\n{'='*20} FINAL REPORT FOR '{job.title}' {'='*20}")
-        print(final_report.model_dump_json(indent=2))
+            for ranked_candidate in final_report.ranked_candidates:
+                # Look up the original applicant from the DB
+                original_applicant = applicant_map.get(ranked_candidate.candidate_id)
+                if original_applicant:
+                    # Add their full resume text to the report
+                    ranked_candidate.full_resume_text = original_applicant.resume_text
+
+        # --- Step 8: Log the final report ---
+        logger.info("Final report for '%s' is ready (%d ranked candidate(s)).", job.title, len(final_report.ranked_candidates))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Final report: %s", final_report.model_dump_json(indent=2))
         return final_report
 
 
+def run_batch_screening(job_ids: List[int], incremental: bool = SCREENING_INCREMENTAL,
+                        include_resume_text: bool = False,
+                        max_concurrency: int = BATCH_SCREENING_JOB_CONCURRENCY) -> Dict[int, Optional[ScreeningReport]]:
+    """
+    Screens several jobs at once. The distinct applicants of all jobs are PII-masked and
+    extracted once, however many of the jobs they applied to; then pre-filtering, matching
+    and storing run per job, max_concurrency jobs in parallel.
+    A job whose pipeline fails is logged and does not stop the others.
+    Returns the report of each job (None if the job does not exist, has no applicants or failed).
+    """
+    job_ids = list(dict.fromkeys(job_ids))
+    logger.info("Starting batch screening of %d job(s)", len(job_ids))
+
+    with span("screening.batch", jobs=len(job_ids)) as attributes:
+        # --- Step 1: Collect the distinct applicants of all jobs ---
+        exclude_statuses = SCREENING_EXCLUDED_STATUSES if incremental else None
+        with Session(engine) as session:
+            applicants = {}
+            for job_id in job_ids:
+                for applicant in get_job_applicants(session, job_id, exclude_statuses=exclude_statuses):
+                    applicants.setdefault(applicant.id, applicant)
+        attributes["applicants"] = len(applicants)
+        logger.info("Batch covers %d distinct applicant(s).", len(applicants))
+
+        # --- Step 2: Mask and extract every distinct applicant once ---
+        with span("screening.batch.screen", applicants=len(applicants)):
+            distinct = list(applicants.values())
+            screened_profiles = dict(zip(applicants, screen_applicants(distinct))) if distinct else {}
+
+        # --- Step 3: Rank each job in parallel from the shared profiles ---
+        reports: Dict[int, Optional[ScreeningReport]] = {}
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="batch-screening") as executor:
+            futures = {submit_in_context(executor, run_screening_pipeline_for_job, job_id,
+                                         include_resume_text=include_resume_text, incremental=incremental,
+                                         screened_profiles=screened_profiles): job_id
+                       for job_id in job_ids}
+            for future in as_completed(futures):
+                job_id = futures[future]
+                try:
+                    reports[job_id] = future.result()
+                except Exception as e:
+                    logger.exception("Screening job %s failed in the batch: %s", job_id, e)
+                    reports[job_id] = None
+                    failed.append(job_id)
+        attributes["failed"] = len(failed)
+    if failed:
+        logger.warning("Batch screening finished with %d failed job(s): %s", len(failed), sorted(failed))
+    return {job_id: reports[job_id] for job_id in job_ids}
+
+
 if __name__ == "__main__":
-    run_screening_pipeline_for_job(job_id=1)  # Test for Senior Python Developer
\ No newline at end of file
+    setup_logging()
+    run_screening_pipeline_for_job(job_id=1)  # Test for Senior Python Developer
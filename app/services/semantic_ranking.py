@@ -0,0 +1,81 @@
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+from app.agents.candidate_matcher import score_shortlist
+from app.core.config import MATCHER_TOP_K
+from app.core.observability import span
+from app.models.candidate import CandidateDetails
+from app.models.job import JobDetails
+from app.models.report import FilteredCandidate, ScreeningReport
+from app.services.rag_service import get_embeddings
+
+logger = logging.getLogger(__name__)
+
+
+def job_embedding_text(job_details: JobDetails) -> str:
+    """The text a job is embedded from: its title, required skills and responsibilities."""
+    return (f"{job_details.job_title}\n"
+            f"Required experience: {job_details.required_experience_years} years\n"
+            f"Skills: {', '.join(job_details.required_skills)}\n"
+            f"Responsibilities: {'; '.join(job_details.key_responsibilities)}")
+
+
+def candidate_embedding_text(profile: CandidateDetails) -> str:
+    """
+    The text a candidate profile is embedded from. It leaves out the candidate ID, so the same
+    profile maps to the same cached vector for every job and every run.
+    """
+    return f"Experience: {profile.experience_years} years\nSkills: {', '.join(profile.extracted_skills)}"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def rank_by_similarity(job_details: JobDetails,
+                       candidate_profiles: List[CandidateDetails]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ranks candidates by the cosine similarity of their profile to the job.
+    Vectors come from the shared embedding cache, so each distinct profile is only embedded once.
+    Returns (order, similarities): candidate indices from most to least similar, and their similarities.
+    """
+    embeddings = get_embeddings()
+    job_vector = _normalize(np.asarray(embeddings.embed_query(job_embedding_text(job_details)), dtype=np.float32))
+    candidate_vectors = _normalize(np.asarray(
+        embeddings.embed_documents([candidate_embedding_text(p) for p in candidate_profiles]), dtype=np.float32))
+    similarities = candidate_vectors @ job_vector
+    order = np.argsort(-similarities, kind="stable")
+    return order, similarities[order]
+
+
+def semantic_candidate_matcher(job_details: JobDetails, candidate_profiles: List[CandidateDetails],
+                               top_k: int = MATCHER_TOP_K) -> ScreeningReport:
+    """
+    Ranks all candidates by embedding similarity to the job, then has the LLM score and justify
+    only the top-K in a single call. Only those LLM-scored candidates are ranked; everyone else
+    is reported as filtered, with their similarity as the pre-score.
+    """
+    logger.info("Ranking %d candidate(s) by semantic similarity...", len(candidate_profiles))
+    with span("screening.semantic_rank", candidates=len(candidate_profiles)):
+        order, similarities = rank_by_similarity(job_details, candidate_profiles)
+
+    shortlist = [candidate_profiles[i] for i in order[:top_k]]
+    logger.info("Scoring the top %d candidate(s) with the LLM...", len(shortlist))
+    ranked = score_shortlist(job_details, shortlist) if shortlist else []
+    ranked_ids = {score.candidate_id for score in ranked}
+    shortlist_ids = {profile.candidate_id for profile in shortlist}
+
+    filtered = []
+    for i, similarity in zip(order, similarities):
+        candidate_id = candidate_profiles[i].candidate_id
+        if candidate_id in ranked_ids:
+            continue
+        reason = ("Skipped by the LLM matcher." if candidate_id in shortlist_ids else
+                  f"Semantic similarity to the job ({similarity:.2f}) is outside the top {top_k}; not reviewed by the LLM.")
+        filtered.append(FilteredCandidate(candidate_id=candidate_id, pre_score=round(max(0.0, float(similarity)), 4),
+                                          reason=reason))
+    logger.info("Matching complete.")
+    return ScreeningReport(job_title=job_details.job_title, ranked_candidates=ranked, filtered_candidates=filtered)
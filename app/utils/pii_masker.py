@@ -1,11 +1,56 @@
-from presidio_analyzer import AnalyzerEngine
-from presidio_anonymizer import AnonymizerEngine
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List
 
-# Set up the analyzer
-analyzer = AnalyzerEngine()
+# Presidio (and through it spaCy) is imported inside the getters below, so importing
+# this module is cheap and the NLP model is only loaded when masking is first needed.
+from app.core.config import PII_MASKING_MODE, PII_SPACY_MODEL, PII_BATCH_SIZE, PII_N_PROCESS
+
+logger = logging.getLogger(__name__)
+
+# Entities masked in every resume
+PII_ENTITIES = ["PERSON", "EMAIL_ADDRESS", "PHONE_NUMBER", "LOCATION"]
+# Entities covered by the regex-only mode, which needs no spaCy model
+REGEX_PII_ENTITIES = ["EMAIL_ADDRESS", "PHONE_NUMBER"]
+
+_worker_pools: Dict[int, ProcessPoolExecutor] = {}
+_worker_pools_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_analyzer(model_name: str = PII_SPACY_MODEL):
+    """
+    Returns an analyzer backed by the given spaCy model.
+    Analyzers are built once per model and shared, so the NLP pipeline is only loaded once.
+    """
+    from presidio_analyzer import AnalyzerEngine
+    from presidio_analyzer.nlp_engine import NlpEngineProvider
+
+    # Start from Presidio's default configuration so entity mappings match AnalyzerEngine()
+    nlp_configuration = dict(NlpEngineProvider().nlp_configuration)
+    nlp_configuration["models"] = [{"lang_code": "en", "model_name": model_name}]
+    nlp_engine = NlpEngineProvider(nlp_configuration=nlp_configuration).create_engine()
+    return AnalyzerEngine(nlp_engine=nlp_engine, supported_languages=["en"])
+
+
+@lru_cache(maxsize=1)
+def get_anonymizer():
+    """Returns the shared anonymizer."""
+    from presidio_anonymizer import AnonymizerEngine
+
+    return AnonymizerEngine()
+
+
+@lru_cache(maxsize=1)
+def get_regex_recognizers():
+    """Returns the regex-based recognizers used by the "regex" masking mode."""
+    from presidio_analyzer.predefined_recognizers import EmailRecognizer, PhoneRecognizer
+
+    return [EmailRecognizer(), PhoneRecognizer()]
 
-# Set up the anonymizer
-anonymizer = AnonymizerEngine()
 
 def mask_pii(text: str) -> str:
     """
@@ -18,17 +63,91 @@ def mask_pii(text: str) -> str:
     :param text: The original text to be anonymized.
     :return: Text with PII masked.
     """
-    print("--- Running PII Scan ---")
-
     # Analyze the text to find PII entities
-    pii_entities = ["PERSON", "EMAIL_ADDRESS", "PHONE_NUMBER", "LOCATION"]
-    analyzer_results = analyzer.analyze(text=text, language='en', entities=pii_entities)
+    analyzer_results = get_analyzer().analyze(text=text, language='en', entities=PII_ENTITIES)
 
     # Anonymize the findings
-    anonymized_result = anonymizer.anonymize(
+    anonymized_result = get_anonymizer().anonymize(
         text=text,
         analyzer_results=analyzer_results
     )
 
-    print("PII scan complete. Data has been masked.")
-    return anonymized_result.text
\ No newline at end of file
+    return anonymized_result.text
+
+
+def _mask_pii_regex(text: str) -> str:
+    """Masks emails and phone numbers only, using regex recognizers and no NLP model."""
+    from presidio_analyzer import EntityRecognizer
+
+    analyzer_results = []
+    for recognizer in get_regex_recognizers():
+        analyzer_results.extend(recognizer.analyze(text=text, entities=REGEX_PII_ENTITIES, nlp_artifacts=None))
+    analyzer_results = EntityRecognizer.remove_duplicates(analyzer_results)
+    return get_anonymizer().anonymize(text=text, analyzer_results=analyzer_results).text
+
+
+def _mask_pii_presidio(texts: List[str], model_name: str, batch_size: int) -> List[str]:
+    """Masks texts with the full analyzer, feeding them through spaCy's nlp.pipe in batches."""
+    from presidio_analyzer import BatchAnalyzerEngine
+
+    batch_analyzer = BatchAnalyzerEngine(analyzer_engine=get_analyzer(model_name))
+    all_results = batch_analyzer.analyze_iterator(texts, language='en', batch_size=batch_size, entities=PII_ENTITIES)
+    anonymizer = get_anonymizer()
+    return [anonymizer.anonymize(text=text, analyzer_results=analyzer_results).text
+            for text, analyzer_results in zip(texts, all_results)]
+
+
+def get_worker_pool(n_process: int) -> ProcessPoolExecutor:
+    """
+    Returns the long-lived pool of n_process masking workers, created on first use.
+    Workers are spawned, not forked: masking runs on request and background screening threads,
+    and a forked child can deadlock on a lock one of the parent's other threads held.
+    Each worker loads the spaCy model once and keeps it for later calls.
+    """
+    with _worker_pools_lock:
+        if n_process not in _worker_pools:
+            _worker_pools[n_process] = ProcessPoolExecutor(max_workers=n_process,
+                                                           mp_context=multiprocessing.get_context("spawn"))
+        return _worker_pools[n_process]
+
+
+def mask_pii_batch(texts: List[str],
+                   mode: str = PII_MASKING_MODE,
+                   model_name: str = PII_SPACY_MODEL,
+                   batch_size: int = PII_BATCH_SIZE,
+                   n_process: int = PII_N_PROCESS) -> List[str]:
+    """
+    Masks PII in many texts at once and returns them in input order.
+
+    :param texts: The original texts to be anonymized.
+    :param mode: "presidio" runs the full analyzer; texts are fed through spaCy's nlp.pipe in
+                 batches, and with the default model the output is identical to mask_pii.
+                 "regex" only masks emails and phone numbers, without loading a spaCy model.
+    :param model_name: The spaCy model used in "presidio" mode, e.g. "en_core_web_sm" for a lighter one.
+    :param batch_size: Number of texts per nlp.pipe batch.
+    :param n_process: Number of worker processes (see get_worker_pool) to spread the work across.
+    :return: Texts with PII masked.
+    """
+    if not texts:
+        return []
+    logger.info("Running PII scan on %d text(s) (%s mode)", len(texts), mode)
+
+    if mode == "regex":
+        if n_process > 1:
+            return list(get_worker_pool(n_process).map(_mask_pii_regex, texts, chunksize=max(1, batch_size)))
+        return [_mask_pii_regex(text) for text in texts]
+
+    if mode != "presidio":
+        raise ValueError(f"Unknown PII masking mode: {mode}")
+
+    if n_process > 1 and len(texts) > batch_size:
+        # One slice per worker (at least a batch each); every worker runs its own nlp.pipe
+        slice_size = max(batch_size, -(-len(texts) // n_process))
+        slices = [texts[start:start + slice_size] for start in range(0, len(texts), slice_size)]
+        pool = get_worker_pool(n_process)
+        masked = [text for chunk in pool.map(_mask_pii_presidio, slices, [model_name] * len(slices),
+                                             [batch_size] * len(slices)) for text in chunk]
+    else:
+        masked = _mask_pii_presidio(texts, model_name, batch_size)
+    logger.info("PII scan complete. Data has been masked.")
+    return masked
@@ -0,0 +1,53 @@
+import logging
+import random
+import re
+import time
+
+from google.api_core.exceptions import ResourceExhausted, TooManyRequests
+
+from app.core.config import RATE_LIMIT_MAX_RETRIES, RATE_LIMIT_BASE_DELAY_SECONDS, RATE_LIMIT_MAX_DELAY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# A 429 status code on its own, so IDs such as "CAND_429" or counts such as "4290 tokens" do not match
+RATE_LIMIT_STATUS_PATTERN = re.compile(r"\b429\b")
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Returns True if the error means the LLM provider is rate limiting us.
+    LangChain sometimes wraps the provider exception, so the exception chain, its status
+    code attribute and the message are checked as well.
+    """
+    current = error
+    while current is not None:
+        if isinstance(current, (ResourceExhausted, TooManyRequests)):
+            return True
+        if getattr(current, "code", None) == 429 or getattr(current, "status_code", None) == 429:
+            return True
+        current = current.__cause__ or current.__context__
+    message = str(error)
+    return (RATE_LIMIT_STATUS_PATTERN.search(message) is not None
+            or "ResourceExhausted" in message or "rate limit" in message.lower())
+
+
+def call_with_backoff(func, *args,
+                      max_retries: int = RATE_LIMIT_MAX_RETRIES,
+                      base_delay: float = RATE_LIMIT_BASE_DELAY_SECONDS,
+                      max_delay: float = RATE_LIMIT_MAX_DELAY_SECONDS,
+                      **kwargs):
+    """
+    Calls func(*args, **kwargs), retrying with exponential backoff and jitter
+    when it fails with a rate limit error. Any other error is raised immediately.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt >= max_retries:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            attempt += 1
+            logger.warning("Rate limited, retrying in %.1fs (attempt %d/%d)...", delay, attempt, max_retries)
+            time.sleep(delay)
@@ -1,24 +1,29 @@
 import os
 from dotenv import load_dotenv
+from app.core.llm import requires_api_key
 from app.services.screening_services import run_screening_pipeline_for_job
 from scripts.seed_db import seed_database
 from app.core.caching import setup_langchain_cache
+from app.core.observability import setup_logging
 
 def main():
     # Load environment variables
     load_dotenv()
-    if "GOOGLE_API_KEY" not in os.environ:
+    setup_logging()
+    if requires_api_key() and "GOOGLE_API_KEY" not in os.environ:
         raise ValueError("GOOGLE_API_KEY not found in .env file. Please add it.")
 
     # --- Setup Caching ---
     setup_langchain_cache()
 
-    # Ensure the database is seeded
+    # Ensure the database schema exists and the demo data is loaded (no-op if already seeded)
     print("--- Ensuring database is seeded ---")
     seed_database()
 
     # --- Run the full, end-to-end pipeline ---
-    run_screening_pipeline_for_job(job_id=1)
+    report = run_screening_pipeline_for_job(job_id=1)
+    if report is not None:
+        print(report.model_dump_json(indent=2))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
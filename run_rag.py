@@ -1,11 +1,14 @@
 import os
 from dotenv import load_dotenv
+from app.core.llm import requires_api_key
+from app.core.observability import setup_logging
 from app.services.rag_service import load_and_build_vector_store, create_rag_chain
 
 def main():
     # Load environment variables
     load_dotenv()
-    if "GOOGLE_API_KEY" not in os.environ:
+    setup_logging()
+    if requires_api_key() and "GOOGLE_API_KEY" not in os.environ:
         raise ValueError("GOOGLE_API_KEY not found in .env file.")
     
     print("--- Initializing RAG Q&A System ---")
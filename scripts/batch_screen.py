@@ -0,0 +1,46 @@
+import argparse
+import json
+
+from dotenv import load_dotenv
+from sqlmodel import Session, select
+
+from app.core.caching import setup_langchain_cache
+from app.core.database import engine
+from app.core.migrations import bootstrap_database
+from app.core.observability import setup_logging
+from app.models.job import Job
+from app.services.screening_services import run_batch_screening
+
+# Screens many jobs in one run (e.g. the nightly re-screen), extracting each applicant only once.
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Screen several jobs at once, sharing candidate extraction.")
+    arg_parser.add_argument("--job-ids", help="Comma-separated job IDs (default: every job)")
+    arg_parser.add_argument("--incremental", action="store_true", help="Only screen new or changed applicants")
+    arg_parser.add_argument("--output", help="Write the reports to this JSON file instead of stdout")
+    args = arg_parser.parse_args()
+
+    load_dotenv()
+    setup_logging()
+    setup_langchain_cache()
+    bootstrap_database()
+
+    if args.job_ids:
+        job_ids = [int(job_id) for job_id in args.job_ids.split(",")]
+    else:
+        with Session(engine) as session:
+            job_ids = list(session.exec(select(Job.id).order_by(Job.id)))
+
+    reports = run_batch_screening(job_ids, incremental=args.incremental)
+    output = json.dumps({job_id: report.model_dump() if report else None for job_id, report in reports.items()}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"Reports for {len(reports)} job(s) written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
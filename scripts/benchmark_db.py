@@ -0,0 +1,103 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import insert, text
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core.database import create_db_engine
+from app.models.job import Job, JobApplication
+from app.models.candidate import Candidate
+from app.models.screening_run import ScreeningRun
+
+def build_database(url: str, candidates: int):
+    """Creates a synthetic database with two jobs and the given number of applicants."""
+    setup_engine = create_engine(url)
+    SQLModel.metadata.create_all(setup_engine)
+    with Session(setup_engine) as session:
+        session.execute(insert(Job), [{"id": 1, "title": "Senior Python Developer", "experience_years_required": 5},
+                                      {"id": 2, "title": "Junior Data Analyst", "experience_years_required": 1}])
+        session.execute(insert(Candidate), [
+            {"id": i, "name": f"Candidate {i}", "experience_years": i % 12,
+             "skills_string": "Python,SQL" if i % 3 else "Java,Spring", "resume_text": "..."}
+            for i in range(1, candidates + 1)
+        ])
+        session.execute(insert(JobApplication), [
+            {"job_id": 1 + i % 2, "candidate_id": i, "status": "Applied"} for i in range(1, candidates + 1)
+        ])
+        session.commit()
+    setup_engine.dispose()
+
+
+def simulate_request(engine, write_ratio: float):
+    """One API request: reads a job's applicants, and sometimes records a screening run."""
+    with Session(engine) as session:
+        job_id = random.choice([1, 2])
+        statement = (select(Candidate).join(JobApplication, JobApplication.candidate_id == Candidate.id)
+                     .where(JobApplication.job_id == job_id).limit(50))
+        session.exec(statement).all()
+        if random.random() < write_ratio:
+            session.add(ScreeningRun(id=uuid.uuid4().hex, job_id=job_id))
+            session.commit()
+
+
+def run_benchmark(name: str, engine, threads: int, requests: int, write_ratio: float):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def timed_request(_):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            simulate_request(engine, write_ratio)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(timed_request, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000 if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0
+    print(f"{name:<10} {requests / elapsed:>10,.0f} req/s   p50 {p50:6.2f} ms   p99 {p99:7.2f} ms   errors {errors}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare request throughput of the default and tuned database engines.")
+    arg_parser.add_argument("--candidates", type=int, default=10000)
+    arg_parser.add_argument("--threads", type=int, default=16)
+    arg_parser.add_argument("--requests", type=int, default=5000)
+    arg_parser.add_argument("--write-ratio", type=float, default=0.1, help="Fraction of requests that also write.")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"Benchmarking {args.requests} requests on {args.threads} threads, "
+              f"{args.candidates} candidates, {args.write_ratio:.0%} writes\n")
+        for name in ("default", "tuned"):
+            url = f"sqlite:///{os.path.join(tmp_dir, name + '.db')}"
+            build_database(url, args.candidates)
+            if name == "default":
+                # What the app used before: default engine settings and rollback journal
+                engine = create_engine(url)
+            else:
+                engine = create_db_engine(url)
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))  # open the first connection (and apply pragmas)
+            run_benchmark(name, engine, args.threads, args.requests, args.write_ratio)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+# Offline end-to-end benchmark: runs the screening pipeline, /ask_rag and /ask_drill_down against
+# synthetic corpora with the fake model provider, and reports latency, throughput and peak memory.
+# Every corpus size runs in its own process with its own database, vector store and caches, so
+# the numbers (peak memory in particular) do not leak from one size into the next.
+
+SKILL_POOL = ["Python", "SQL", "Docker", "Kubernetes", "AWS", "Java", "Spring", "React", "Go", "Tableau",
+              "FastAPI", "Django", "Flask", "PostgreSQL", "Redis", "Terraform", "Spark", "Airflow",
+              "Azure", "GCP", "Kafka", "Scala", "Rust", "TypeScript", "Node.js", "Pandas", "PyTorch"]
+JOB_TITLE = "Backend Engineer (Python, SQL, Docker, Kubernetes)"
+RESULT_MARKER = "BENCHMARK_RESULT "
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Returns the nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """Summarizes per-request latencies (in seconds) as p50/p99 in ms and requests per second."""
+    total = sum(samples)
+    return {"requests": len(samples),
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+            "throughput_per_s": len(samples) / total if total else 0.0}
+
+
+def synthetic_resume(candidate_id: int, experience_years: int, skills: List[str]) -> str:
+    return (f"Candidate {candidate_id}\n"
+            f"Experience: {experience_years} years\n"
+            f"Skills: {', '.join(skills)}\n"
+            f"Worked on {skills[0]} and {skills[1]} projects, and mentored engineers using {skills[2]}.")
+
+
+def build_corpus(engine, size: int) -> List[str]:
+    """Creates job 1 with `size` applicants and returns their resume texts."""
+    from sqlalchemy import insert
+    from sqlmodel import Session
+
+    from app.models.job import Job, JobApplication
+    from app.models.candidate import Candidate, CandidateSkill, split_skills
+
+    random.seed(size)
+    candidate_rows, skill_rows, application_rows, resumes = [], [], [], []
+    for i in range(1, size + 1):
+        skills = random.sample(SKILL_POOL, 5)
+        experience_years = random.randint(0, 15)
+        resume = synthetic_resume(i, experience_years, skills)
+        resumes.append(resume)
+        candidate_rows.append({"id": i, "name": f"Candidate {i}", "experience_years": experience_years,
+                               "skills_string": ",".join(skills), "resume_text": resume})
+        skill_rows.extend({"skill": s, "candidate_id": i} for s in split_skills(",".join(skills)))
+        application_rows.append({"job_id": 1, "candidate_id": i, "status": "Applied"})
+
+    with Session(engine) as session:
+        session.execute(insert(Job), [{"id": 1, "title": JOB_TITLE, "experience_years_required": 5}])
+        for table, rows in ((Candidate, candidate_rows), (CandidateSkill, skill_rows), (JobApplication, application_rows)):
+            for start in range(0, len(rows), 10000):
+                session.execute(insert(table), rows[start:start + 10000])
+        session.commit()
+    return resumes
+
+
+def run_size(size: int, rag_queries: int, drill_down_queries: int) -> Dict:
+    """Benchmarks one corpus size. Runs in a child process whose environment selects the fake provider."""
+    # Imported here, after the parent process has pointed the settings at this run's temp files
+    from fastapi.testclient import TestClient
+    from langchain_community.vectorstores import FAISS
+
+    from app.core import startup
+    from app.core.database import engine
+    from app.core.migrations import bootstrap_database
+    from app.main import app
+    from app.services import rag_service
+    from app.services.pdf_ingestion import peak_memory_mb
+    from app.services.screening_services import run_screening_pipeline_for_job
+
+    result = {"size": size}
+    bootstrap_database()
+    resumes = build_corpus(engine, size)
+
+    # --- Screening pipeline: cold (every resume extracted), then warm (extraction cache hits) ---
+    for phase in ("pipeline_cold", "pipeline_warm"):
+        started = time.perf_counter()
+        report = run_screening_pipeline_for_job(1, include_resume_text=False)
+        elapsed = time.perf_counter() - started
+        result[phase] = {"seconds": elapsed, "candidates_per_s": size / elapsed,
+                         "ranked": len(report.ranked_candidates) if report else 0}
+
+    # --- RAG index: one chunk per synthetic resume, tagged like ingested PDFs ---
+    started = time.perf_counter()
+    metadatas = [{"candidate_id": f"CAND_{i}", "file_name": f"resume_{i}.pdf"} for i in range(1, size + 1)]
+    rag_service.vector_store = FAISS.from_texts(resumes, rag_service.get_embeddings(), metadatas=metadatas)
+    rag_service.hybrid_retriever = None
+    rag_service.rag_chain = None
+    rag_service.get_rag_chain()
+    result["index_build_seconds"] = time.perf_counter() - started
+    startup.mark_ready()
+
+    client = TestClient(app)
+
+    def timed_post(path: str, payload: dict) -> float:
+        started = time.perf_counter()
+        response = client.post(path, json=payload)
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        return elapsed
+
+    questions = [f"Which candidates have experience with {skill}?" for skill in SKILL_POOL]
+    result["ask_rag"] = latency_summary(
+        [timed_post("/ask_rag", {"question": questions[i % len(questions)]}) for i in range(rag_queries)])
+    # Half of the drill-down questions repeat a resume, which exercises the chain cache
+    result["ask_drill_down"] = latency_summary(
+        [timed_post("/ask_drill_down", {"context_text": resumes[(i // 2) % size], "question": "What are their main skills?"})
+         for i in range(drill_down_queries)])
+    result["peak_memory_mb"] = peak_memory_mb()
+    return result
+
+
+def run_in_subprocess(size: int, args) -> Dict:
+    """Runs one corpus size in a fresh interpreter with temp files and the fake provider."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ,
+                   MODEL_PROVIDER="fake",
+                   PII_MASKING_MODE="regex",
+                   LLM_CACHE_BACKEND="none",
+                   SEED_DEMO_DATA="false",
+                   LOG_LEVEL="WARNING",
+                   FAKE_LLM_LATENCY_SECONDS=str(args.llm_latency),
+                   FAKE_EMBEDDING_LATENCY_SECONDS=str(args.embedding_latency),
+                   DATABASE_URL=f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}",
+                   DATABASE_READ_URL="",
+                   VECTOR_STORE_DIR=os.path.join(tmp_dir, "vector_store"),
+                   EMBEDDING_CACHE_PATH=os.path.join(tmp_dir, "embedding_cache.db"),
+                   PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+        command = [sys.executable, __file__, "--size", str(size),
+                   "--rag-queries", str(args.rag_queries), "--drill-down-queries", str(args.drill_down_queries)]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"Benchmark for {size} candidates failed:\n{completed.stderr[-2000:]}")
+
+
+def print_results(results: List[Dict]):
+    print(f"\n{'candidates':>10}{'cold run (s)':>14}{'cand/s':>9}{'warm run (s)':>14}{'cand/s':>9}"
+          f"{'rag p50/p99 (ms)':>20}{'drill p50/p99 (ms)':>22}{'peak MB':>9}")
+    for r in results:
+        rag, drill = r["ask_rag"], r["ask_drill_down"]
+        print(f"{r['size']:>10}{r['pipeline_cold']['seconds']:>14.2f}{r['pipeline_cold']['candidates_per_s']:>9.0f}"
+              f"{r['pipeline_warm']['seconds']:>14.2f}{r['pipeline_warm']['candidates_per_s']:>9.0f}"
+              f"{rag['p50_ms']:>11.1f}/{rag['p99_ms']:<8.1f}{drill['p50_ms']:>13.1f}/{drill['p99_ms']:<8.1f}"
+              f"{r['peak_memory_mb']:>9.0f}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the screening pipeline and RAG endpoints offline with the fake model provider.")
+    arg_parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated corpus sizes, e.g. 10,1000,100000")
+    arg_parser.add_argument("--rag-queries", type=int, default=50)
+    arg_parser.add_argument("--drill-down-queries", type=int, default=20)
+    arg_parser.add_argument("--llm-latency", type=float, default=0.05, help="Simulated seconds per chat call")
+    arg_parser.add_argument("--embedding-latency", type=float, default=0.01, help="Simulated seconds per embedding call")
+    arg_parser.add_argument("--json", help="Also write the results to this file, for tracking regressions")
+    arg_parser.add_argument("--size", type=int, help=argparse.SUPPRESS)  # Internal: run one size in this process
+    args = arg_parser.parse_args()
+
+    if args.size is not None:
+        print(RESULT_MARKER + json.dumps(run_size(args.size, args.rag_queries, args.drill_down_queries)))
+        return
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"Benchmarking {size} candidates...")
+        results.append(run_in_subprocess(size, args))
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert, text
+from sqlmodel import Session, SQLModel, select
+
+from app.core.database import create_db_engine
+from app.models.job import Job, JobApplication
+from app.models.candidate import Candidate, CandidateSkill, split_skills
+from app.services.candidate_queries import get_job_applicants, find_candidates_with_skills
+
+SKILL_POOL = ["Python", "SQL", "Docker", "Kubernetes", "AWS", "Java", "Spring", "React", "Go", "Tableau",
+              "FastAPI", "Django", "Flask", "PostgreSQL", "Redis", "Terraform", "Spark", "Airflow",
+              "Azure", "GCP", "Kafka", "Scala", "Rust", "C++", "C#", ".NET", "TypeScript", "Node.js",
+              "Angular", "Vue", "Figma", "Excel", "Power BI", "Pandas", "NumPy", "PyTorch", "TensorFlow",
+              "MongoDB", "Elasticsearch", "GraphQL", "Linux", "Bash", "Ansible", "Jenkins", "Git",
+              "Project Management", "Leadership", "Agile", "Scrum", "User Research", "Prototyping",
+              "Snowflake", "dbt", "Looker", "Hadoop", "Swift", "Kotlin", "Flutter", "Ruby", "Rails"]
+# Real resumes are long, which is what makes full-table LIKE scans expensive
+RESUME_FILLER = "Experienced professional with a track record of delivering projects. " * 10
+SECONDARY_INDEXES = ["ix_jobapplication_candidate_id", "ix_jobapplication_job_id_status",
+                     "ix_candidate_experience_years", "ix_candidateskill_candidate_id"]
+
+
+def build_database(engine, candidates: int, jobs: int):
+    """Fills the database with synthetic jobs, candidates, skills and applications."""
+    random.seed(7)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(Job), [{"id": j, "title": f"Job {j}", "experience_years_required": j % 8}
+                                      for j in range(1, jobs + 1)])
+        candidate_rows, skill_rows, application_rows = [], [], []
+        for i in range(1, candidates + 1):
+            skills_string = ",".join(random.sample(SKILL_POOL, 5))
+            candidate_rows.append({"id": i, "name": f"Candidate {i}", "experience_years": random.randint(0, 40),
+                                   "skills_string": skills_string, "resume_text": RESUME_FILLER})
+            skill_rows.extend({"skill": s, "candidate_id": i} for s in split_skills(skills_string))
+            application_rows.append({"job_id": random.randint(1, jobs), "candidate_id": i,
+                                     "status": random.choice(["Applied", "Screening", "Rejected"])})
+        for table, rows in ((Candidate, candidate_rows), (CandidateSkill, skill_rows), (JobApplication, application_rows)):
+            for start in range(0, len(rows), 10000):
+                session.execute(insert(table), rows[start:start + 10000])
+        session.commit()
+
+
+def timed(func, repeat: int) -> float:
+    """Returns the mean wall time of func in milliseconds, after one warm-up call."""
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare applicant/skill queries before and after the indexes and skill table.")
+    arg_parser.add_argument("--candidates", type=int, default=100000)
+    arg_parser.add_argument("--jobs", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        print(f"Building database with {args.candidates} candidates across {args.jobs} jobs...")
+        build_database(engine, args.candidates, args.jobs)
+
+        def like_query():
+            with Session(engine) as session:
+                session.exec(select(Candidate).where(Candidate.experience_years > 29)
+                             .where(Candidate.skills_string.like("%Kubernetes%"))
+                             .where(Candidate.skills_string.like("%Terraform%"))).all()
+
+        def skill_table_query():
+            with Session(engine) as session:
+                find_candidates_with_skills(session, ["Kubernetes", "Terraform"], min_experience=30)
+
+        def lazy_applicants():
+            with Session(engine) as session:
+                len(session.get(Job, 1).candidates)
+
+        def paged_applicants():
+            with Session(engine) as session:
+                len(get_job_applicants(session, 1))
+
+        def status_query():
+            with Session(engine) as session:
+                session.exec(select(JobApplication).where(JobApplication.job_id == 1,
+                                                          JobApplication.status == "Screening")).all()
+
+        def experience_query():
+            with Session(engine) as session:
+                session.exec(select(Candidate.id).where(Candidate.experience_years >= 39)).all()
+
+        # "Before": drop the secondary indexes added for this benchmark's queries
+        with engine.begin() as connection:
+            for index in SECONDARY_INDEXES:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        before = {
+            "skill search (LIKE vs skill table)": timed(like_query, args.repeat),
+            "applicants of a job (lazy vs paged)": timed(lazy_applicants, args.repeat),
+            "applications by job + status": timed(status_query, args.repeat),
+            "candidates by experience": timed(experience_query, args.repeat),
+        }
+
+        # "After": restore the indexes and use the new query paths
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            for table in SQLModel.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+            connection.execute(text("ANALYZE"))
+        after = {
+            "skill search (LIKE vs skill table)": timed(skill_table_query, args.repeat),
+            "applicants of a job (lazy vs paged)": timed(paged_applicants, args.repeat),
+            "applications by job + status": timed(status_query, args.repeat),
+            "candidates by experience": timed(experience_query, args.repeat),
+        }
+
+        print(f"\n{'query':<40}{'before (ms)':>14}{'after (ms)':>14}{'speed-up':>10}")
+        for name in before:
+            speedup = before[name] / after[name] if after[name] else float("inf")
+            print(f"{name:<40}{before[name]:>14.2f}{after[name]:>14.2f}{speedup:>9.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import argparse
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from app.core.config import BULK_IMPORT_BATCH_SIZE
+from app.core.database import engine
+from app.core.migrations import bootstrap_database
+from app.models.candidate import Candidate, CandidateSkill, JobApplication, split_skills
+
+def read_records(file_path: str) -> Iterator[Dict]:
+    """Streams records from a .csv or .jsonl file one at a time, so memory use stays flat."""
+    path = Path(file_path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.suffix == ".csv":
+            yield from csv.DictReader(f)
+        elif path.suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unsupported file type '{path.suffix}', expected .csv or .jsonl")
+
+
+def candidate_row(record: Dict) -> Dict:
+    """Converts an input record into a Candidate row. Skills may be a list or a comma-separated string."""
+    skills = record.get("skills", record.get("skills_string", ""))
+    if isinstance(skills, list):
+        skills = ",".join(skills)
+    row = {
+        "name": record["name"],
+        "experience_years": int(record["experience_years"]),
+        "skills_string": skills,
+        "resume_text": record.get("resume_text", ""),
+    }
+    if record.get("id") not in (None, ""):
+        row["id"] = int(record["id"])
+    return row
+
+
+def application_row(record: Dict) -> Dict:
+    """Converts an input record into a JobApplication row."""
+    return {
+        "job_id": int(record["job_id"]),
+        "candidate_id": int(record["candidate_id"]),
+        "status": record.get("status") or "Applied",
+    }
+
+
+def bulk_insert(file_path: str, model, to_row: Callable[[Dict], Dict], batch_size: int = BULK_IMPORT_BATCH_SIZE) -> int:
+    """
+    Inserts the records of a file in large batches (one executemany per batch and
+    one transaction per batch) and reports throughput. Returns the number of rows inserted.
+    """
+    started = time.perf_counter()
+    total = 0
+    batch: List[Dict] = []
+
+    def flush():
+        nonlocal total
+        with Session(engine) as session:
+            if model is Candidate:
+                # Fetch the new IDs (in input order) to index each candidate's skills
+                ids = session.execute(insert(Candidate).returning(Candidate.id, sort_by_parameter_order=True), batch).scalars().all()
+                skill_rows = [{"skill": skill, "candidate_id": candidate_id}
+                              for candidate_id, row in zip(ids, batch) for skill in split_skills(row["skills_string"])]
+                if skill_rows:
+                    session.execute(insert(CandidateSkill), skill_rows)
+            else:
+                session.execute(insert(model), batch)
+            session.commit()
+        total += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"  {total} {model.__tablename__} rows ({total / elapsed:,.0f} rows/s)")
+        batch.clear()
+
+    for record in read_records(file_path):
+        batch.append(to_row(record))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Imported {total} {model.__tablename__} rows from {file_path} in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    return total
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Bulk-import candidates and job applications from CSV or JSONL files.")
+    arg_parser.add_argument("--candidates", help="File with name, experience_years, skills (or skills_string), resume_text and optional id.")
+    arg_parser.add_argument("--applications", help="File with job_id, candidate_id and optional status.")
+    arg_parser.add_argument("--batch-size", type=int, default=BULK_IMPORT_BATCH_SIZE, help="Rows per INSERT batch.")
+    args = arg_parser.parse_args()
+
+    if not args.candidates and not args.applications:
+        arg_parser.error("Nothing to import: pass --candidates and/or --applications.")
+
+    bootstrap_database()
+    print("--- Bulk import ---")
+    # Candidates go first so applications can reference them
+    if args.candidates:
+        bulk_insert(args.candidates, Candidate, candidate_row, args.batch_size)
+    if args.applications:
+        bulk_insert(args.applications, JobApplication, application_row, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
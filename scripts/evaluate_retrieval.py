@@ -0,0 +1,77 @@
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from app.core.config import RAG_TOP_K, RAG_FETCH_K, RAG_BM25_WEIGHT, RAG_RERANKER_MODEL
+from app.services import rag_service
+from app.services.hybrid_retriever import HybridRetriever
+
+EVAL_SET = "data/eval/retrieval_eval.jsonl"
+
+
+def load_eval_set(path: str) -> List[Dict]:
+    """Loads the questions, each with the file and a text snippet that answers it."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def is_hit(document, example: Dict) -> bool:
+    """A retrieved chunk is relevant if it comes from the expected file and contains the expected text."""
+    text = " ".join(document.page_content.split()).lower()
+    return (document.metadata.get("file_name") == example["relevant_file"]
+            and " ".join(example["relevant_text"].split()).lower() in text)
+
+
+def evaluate(name: str, retriever: HybridRetriever, examples: List[Dict]):
+    """Prints recall@k, MRR and latency percentiles of one retriever configuration."""
+    latencies, hits, reciprocal_ranks = [], 0, []
+    for example in examples:
+        started = time.perf_counter()
+        documents = retriever.invoke(example["question"])
+        latencies.append((time.perf_counter() - started) * 1000)
+        rank = next((i for i, document in enumerate(documents, start=1) if is_hit(document, example)), None)
+        hits += rank is not None
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{name:<22}{hits / len(examples):>10.2f}{statistics.mean(reciprocal_ranks):>8.2f}"
+          f"{statistics.median(latencies):>10.2f}{p95:>10.2f}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Report retrieval recall and latency on the bundled evaluation set.")
+    arg_parser.add_argument("--eval-set", default=EVAL_SET)
+    arg_parser.add_argument("--k", type=int, default=RAG_TOP_K, help="Chunks returned per question.")
+    arg_parser.add_argument("--fetch-k", type=int, default=RAG_FETCH_K)
+    arg_parser.add_argument("--bm25-weight", type=float, default=RAG_BM25_WEIGHT)
+    arg_parser.add_argument("--reranker", default=RAG_RERANKER_MODEL, help="Cross-encoder model to also evaluate re-ranking with.")
+    args = arg_parser.parse_args()
+
+    examples = load_eval_set(args.eval_set)
+    rag_service.load_and_build_vector_store()
+    base = HybridRetriever.from_vector_store(rag_service.vector_store, k=args.k, fetch_k=args.fetch_k, reranker_model=None)
+
+    # Embed every question once up front, so latencies measure retrieval rather than the embedding API
+    for example in examples:
+        rag_service.get_embeddings().embed_query(example["question"])
+
+    configurations = {
+        "vector": base.model_copy(update={"bm25_weight": 0.0}),
+        "bm25": base.model_copy(update={"bm25_weight": 1.0}),
+        f"hybrid (w={args.bm25_weight:g})": base.model_copy(update={"bm25_weight": args.bm25_weight}),
+    }
+    if args.reranker:
+        configurations["hybrid + rerank"] = base.model_copy(update={"bm25_weight": args.bm25_weight,
+                                                                   "reranker_model": args.reranker})
+
+    print(f"\n{len(examples)} questions, {base.vector_store.index.ntotal} chunks, k={args.k}\n")
+    print(f"{'retriever':<22}{'recall@k':>10}{'MRR':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for name, retriever in configurations.items():
+        evaluate(name, retriever, examples)
+
+
+if __name__ == "__main__":
+    main()
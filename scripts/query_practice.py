@@ -1,7 +1,7 @@
 from sqlmodel import Session, select
 from app.core.database import engine
 from app.models.job import Job
-from app.models.candidate import Candidate
+from app.models.candidate import Candidate, CandidateSkill
 
 def practice_queries():
     print("--- Practicing SQL Queries with SQLModel ---")
@@ -23,7 +23,9 @@ def practice_queries():
             
         # Query 3: Find all experienced candidates with Python skills
         print("\n[Query 3: Find experienced candidates (>4 years) with Python skills]")
-        statement = select(Candidate).where(Candidate.experience_years > 4).where(Candidate.skills_string.like("%Python%"))
+        # Uses the indexed skill table rather than skills_string.like("%Python%"), which scans every row
+        statement = (select(Candidate).join(CandidateSkill, CandidateSkill.candidate_id == Candidate.id)
+                     .where(Candidate.experience_years > 4).where(CandidateSkill.skill == "python"))
         results = session.exec(statement).all()
         for candidate in results:
             print(f"- {candidate.name} ({candidate.experience_years} years exp)")
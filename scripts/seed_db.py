@@ -1,7 +1,11 @@
-from sqlmodel import SQLModel, Session
+import argparse
+
+from sqlmodel import Session, select
 from app.core.database import engine
-from app.models.job import Job
-from app.models.candidate import Candidate, JobApplication
+from app.core.migrations import bootstrap_database
+from app.models.job import Job, JobProfile, JobScreeningResult
+from app.models.candidate import Candidate, CandidateProfile, CandidateSkill, JobApplication, split_skills
+from app.models.screening_run import ScreeningRun
 
 # --- MOCK DATA ---
 RESUME_1_TEXT = """
@@ -35,18 +39,32 @@ of 10 people to build a commercial level system that allows my previous company
 revenue. A rapid learner who is eager to always learn and improve.
 """
 
-def seed_database():
-    print("--- Seeding Database ---")
-
-    # Create the tables in the database based on the models
-    SQLModel.metadata.create_all(engine)
+def seed_database(reset: bool = False):
+    """
+    Loads the demo jobs and candidates into an empty database.
+    Existing data is left alone unless reset=True, which wipes it first.
+    """
+    # Make sure the schema exists and is migrated
+    bootstrap_database()
 
     # Use a session to interact with the database
     with Session(engine) as session:
-        # Clear existing data to make the script re-runnable
-        session.query(JobApplication).delete()
-        session.query(Candidate).delete()
-        session.query(Job).delete()
+        if reset:
+            print("--- Resetting Database ---")
+            # Stored outcomes and runs refer to job and candidate IDs that are about to be reused
+            session.query(JobScreeningResult).delete()
+            session.query(ScreeningRun).delete()
+            session.query(JobApplication).delete()
+            session.query(CandidateProfile).delete()
+            session.query(CandidateSkill).delete()
+            session.query(JobProfile).delete()
+            session.query(Candidate).delete()
+            session.query(Job).delete()
+        elif session.exec(select(Job.id).limit(1)).first() is not None:
+            print("--- Database already contains data, skipping seed ---")
+            return
+
+        print("--- Seeding Database ---")
 
         # --- Create Job objects ---
         job1 = Job(title="Senior Python Developer", experience_years_required=5)
@@ -77,9 +95,16 @@ def seed_database():
 
         # Now add JobApplications with IDs set
         session.add_all([app1, app2, app3, app4, app5])
+
+        # Index each candidate's skills in the normalized skill table
+        session.add_all([CandidateSkill(skill=skill, candidate_id=cand.id)
+                         for cand in [cand1, cand2, cand3, cand4] for skill in split_skills(cand.skills_string)])
         session.commit()
 
     print("--- Database seeding complete! ---")
 
 if __name__ == "__main__":
-    seed_database()
\ No newline at end of file
+    arg_parser = argparse.ArgumentParser(description="Load the demo data into the database.")
+    arg_parser.add_argument("--reset", action="store_true", help="Delete all jobs, candidates and applications first.")
+    args = arg_parser.parse_args()
+    seed_database(reset=args.reset)
\ No newline at end of file
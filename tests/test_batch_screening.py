@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+from app.models.candidate import CandidateDetails
+from app.models.report import ScreeningReport
+from app.services import screening_services
+from app.services.screening_services import run_batch_screening
+
+APPLICANTS = {1: [1, 2], 2: [2, 3], 3: [3]}
+
+
+def test_batch_screens_shared_applicants_once_and_survives_a_failed_job(monkeypatch):
+    screened, pipeline_calls = [], {}
+
+    def fake_get_job_applicants(session, job_id, exclude_statuses=None):
+        return [SimpleNamespace(id=candidate_id) for candidate_id in APPLICANTS[job_id]]
+
+    def fake_screen_applicants(applicants, **kwargs):
+        screened.extend(applicant.id for applicant in applicants)
+        return [CandidateDetails(candidate_id=f"CAND_{applicant.id}", extracted_skills=[], experience_years=1)
+                for applicant in applicants]
+
+    def fake_pipeline(job_id, include_resume_text, incremental, screened_profiles):
+        pipeline_calls[job_id] = sorted(screened_profiles)
+        if job_id == 2:
+            raise RuntimeError("matcher unavailable")
+        return ScreeningReport(job_title=f"Job {job_id}", ranked_candidates=[])
+
+    monkeypatch.setattr(screening_services, "get_job_applicants", fake_get_job_applicants)
+    monkeypatch.setattr(screening_services, "screen_applicants", fake_screen_applicants)
+    monkeypatch.setattr(screening_services, "run_screening_pipeline_for_job", fake_pipeline)
+
+    reports = run_batch_screening([1, 2, 3, 1])
+
+    assert sorted(screened) == [1, 2, 3]
+    assert pipeline_calls == {1: [1, 2, 3], 2: [1, 2, 3], 3: [1, 2, 3]}
+    assert list(reports) == [1, 2, 3]
+    assert reports[1].job_title == "Job 1"
+    assert reports[2] is None
+    assert reports[3].job_title == "Job 3"
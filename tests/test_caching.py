@@ -0,0 +1,65 @@
+from langchain_core.outputs import Generation
+
+from app.core.caching import TieredLLMCache, normalize_prompt
+
+LLM = "fake-llm"
+
+
+def make_cache(tmp_path, **kwargs):
+    return TieredLLMCache(database_path=str(tmp_path / "llm_cache.db"), **kwargs)
+
+
+def texts(generations):
+    return [generation.text for generation in generations]
+
+
+# --- CAND_ ID normalization ---
+
+def test_normalize_prompt_numbers_ids_in_order_of_first_appearance():
+    normalized, ids = normalize_prompt("Score CAND_7, then CAND_3, then CAND_7 again")
+    assert normalized == "Score <<ID_1>>, then <<ID_2>>, then <<ID_1>> again"
+    assert ids == ["CAND_7", "CAND_3"]
+
+
+def test_prompts_differing_only_in_candidate_ids_share_one_entry(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.update("Score CAND_1 and CAND_2", LLM, [Generation(text="CAND_2 beats CAND_1")])
+
+    assert cache.lookup("Score CAND_7 and CAND_8", LLM) is not None
+    assert cache.lookup("Score CAND_1 and CAND_3 and CAND_4", LLM) is None
+    assert cache.get_stats()["disk_entries"] == 1
+
+
+def test_hit_returns_the_current_prompts_ids(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.update("Score CAND_1 and CAND_2", LLM, [Generation(text="CAND_2 beats CAND_1")])
+
+    assert texts(cache.lookup("Score CAND_7 and CAND_8", LLM)) == ["CAND_8 beats CAND_7"]
+    # A fresh process has an empty memory tier, so the same remapping has to work for disk hits
+    reopened = make_cache(tmp_path)
+    assert texts(reopened.lookup("Score CAND_a1 and CAND_b2", LLM)) == ["CAND_b2 beats CAND_a1"]
+    assert cache.stats["memory_hits"] == 1
+    assert reopened.stats["disk_hits"] == 1
+
+
+def test_ids_in_the_response_but_not_in_the_prompt_are_kept(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.update("Score CAND_1 and CAND_2", LLM, [Generation(text="CAND_1 and CAND_99 tie, CAND_2 is out")])
+
+    assert texts(cache.lookup("Score CAND_7 and CAND_8", LLM)) == ["CAND_7 and CAND_99 tie, CAND_8 is out"]
+
+
+# --- Eviction ---
+
+def test_eviction_keeps_the_store_under_its_size_cap(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=20_000, memory_items=10)
+    for i in range(300):
+        cache.update(f"Prompt {i}", LLM, [Generation(text=f"Response {i} " + "x" * 50)])
+
+    stats = cache.get_stats()
+    assert stats["evictions"] > 0
+    assert 0 < stats["disk_bytes"] <= 20_000
+    assert stats["disk_entries"] < 300
+    # The least recently used entries go first
+    assert cache.lookup("Prompt 299", LLM) is not None
+    assert make_cache(tmp_path).lookup("Prompt 0", LLM) is None
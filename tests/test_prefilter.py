@@ -0,0 +1,77 @@
+import pytest
+
+from app.models.candidate import CandidateDetails
+from app.services.prefilter import normalize_skill, prefilter_candidates, score_candidates
+
+REQUIRED_SKILLS = ["Python", "SQL", "Docker"]
+
+
+def profile(candidate_id, skills, years):
+    return CandidateDetails(candidate_id=candidate_id, extracted_skills=skills, experience_years=years)
+
+
+def prefilter(profiles, **kwargs):
+    kwargs = {"min_score": 0.0, "top_n": 0, "max_experience_gap": 3, **kwargs}
+    kept, filtered = prefilter_candidates(REQUIRED_SKILLS, 5, profiles, **kwargs)
+    return [p.candidate_id for p in kept], {f.candidate_id: f for f in filtered}
+
+
+# --- score_candidates ---
+
+def test_normalize_skill_collapses_case_and_punctuation():
+    assert normalize_skill(" Node.JS ") == "node js"
+
+
+def test_skill_overlap_and_experience_gap():
+    profiles = [profile("A", ["python", "Strong SQL"], 5), profile("B", ["JavaScript"], 2)]
+    pre_scores, overlap, gap = score_candidates(REQUIRED_SKILLS + ["Java"], 5, profiles, skill_weight=0.7)
+
+    # "Strong SQL" covers "SQL", but "JavaScript" does not cover "Java"
+    assert list(overlap) == [0.5, 0.0]
+    assert list(gap) == [0.0, 3.0]
+    assert pre_scores[0] == pytest.approx(0.7 * 0.5 + 0.3)
+    assert pre_scores[1] == pytest.approx(0.3 * (1 - 3 / 5))
+
+
+# --- Thresholds ---
+
+def test_no_skill_overlap_is_filtered_before_experience():
+    kept, filtered = prefilter([profile("A", ["Excel"], 0)])
+    assert kept == []
+    assert filtered["A"].reason == "No overlap with the required skills (Python, SQL, Docker)."
+
+
+def test_experience_gap_threshold_is_inclusive():
+    kept, filtered = prefilter([profile("A", ["Python"], 2), profile("B", ["Python"], 1)])
+    assert kept == ["A"]
+    assert filtered["B"].reason == "Has 1 years of experience; the job requires 5."
+
+
+def test_pre_score_below_cutoff():
+    # 1/3 of the skills and a 3-year gap: 0.7 * 0.333 + 0.3 * 0.4 = 0.35
+    kept, filtered = prefilter([profile("A", ["Python"], 2), profile("B", ["Python", "SQL"], 5)], min_score=0.4)
+    assert kept == ["B"]
+    assert filtered["A"].reason == "Pre-score 0.35 is below the cutoff of 0.40."
+    assert filtered["A"].pre_score == pytest.approx(0.3533, abs=1e-4)
+
+
+# --- Top-N ---
+
+def test_ties_at_the_top_n_boundary_keep_applicant_order():
+    profiles = [profile("A", ["Python"], 5), profile("B", ["Python", "SQL", "Docker"], 5),
+                profile("C", ["SQL"], 5), profile("D", ["Docker"], 5)]
+    kept, filtered = prefilter(profiles, top_n=2)
+
+    # B ranks first; A, C and D tie for the last slot, which goes to the earliest applicant
+    assert kept == ["A", "B"]
+    assert filtered["C"].reason == "Ranked #3 by pre-score; only the top 2 are sent to the matcher."
+    assert filtered["D"].reason == "Ranked #4 by pre-score; only the top 2 are sent to the matcher."
+
+
+def test_threshold_filtered_candidates_do_not_take_top_n_slots():
+    profiles = [profile("A", ["Python", "SQL", "Docker"], 0), profile("B", ["Python"], 5), profile("C", ["SQL"], 4)]
+    kept, filtered = prefilter(profiles, top_n=2)
+
+    assert kept == ["B", "C"]
+    assert set(filtered) == {"A"}
+    assert filtered["A"].reason.startswith("Has 0 years of experience")
@@ -0,0 +1,37 @@
+import json
+
+from app.agents import resume_screener
+from app.core.fake_models import FakeChatModel
+from app.services.screening_services import _screen_batch
+
+RESUMES = [(1, "Experience: 5 years\nSkills: Python, SQL"),
+           (2, "Experience: 3 years\nSkills: Java, Spring"),
+           (3, "Experience: 8 years\nSkills: Go, Kubernetes")]
+
+
+class MalformedEntryChatModel(FakeChatModel):
+    """Answers batched prompts with a malformed entry for resume 2; records which kind of prompt it got."""
+    calls: list = []
+
+    def respond(self, prompt: str) -> str:
+        if '"resume_index"' in prompt:
+            self.calls.append("batch")
+            output = json.loads(super().respond(prompt))
+            for entry in output["candidates"]:
+                if entry["resume_index"] == 2:
+                    entry["experience_years"] = "several"
+            return json.dumps(output)
+        self.calls.append("single")
+        return super().respond(prompt)
+
+
+def test_malformed_batch_entry_is_extracted_on_its_own(monkeypatch):
+    model = MalformedEntryChatModel(calls=[])
+    monkeypatch.setattr(resume_screener, "get_chat_model", lambda **kwargs: model)
+
+    profiles = _screen_batch(RESUMES)
+
+    assert model.calls == ["batch", "single"]
+    assert [profile.candidate_id for profile in profiles] == ["CAND_1", "CAND_2", "CAND_3"]
+    assert [profile.experience_years for profile in profiles] == [5, 3, 8]
+    assert profiles[1].extracted_skills == ["Java", "Spring"]
@@ -0,0 +1,45 @@
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.models.screening_run import ScreeningRun
+from app.services import screening_jobs
+from app.services.screening_jobs import _ProgressWriter, submit_screening_run
+
+
+def test_progress_writes_are_throttled_but_stage_changes_are_not(monkeypatch):
+    writes = []
+    monkeypatch.setattr(screening_jobs, "_update_run", lambda run_id, **fields: writes.append(fields))
+    progress = _ProgressWriter("run", interval=3600)
+
+    progress(applicants_total=3, applicants_screened=0)
+    for screened in range(1, 4):
+        progress(applicants_screened=screened)
+    progress(matcher_status="running")
+    progress.flush(status="completed")
+
+    assert writes == [
+        {"applicants_total": 3, "applicants_screened": 0},
+        {"applicants_screened": 3, "matcher_status": "running"},
+        {"status": "completed"},
+    ]
+
+
+def test_failed_submit_releases_the_queue_slot(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'runs.db'}")
+    SQLModel.metadata.create_all(engine, tables=[ScreeningRun.__table__])
+
+    class BrokenExecutor:
+        def submit(self, *args):
+            raise RuntimeError("executor is shut down")
+
+    monkeypatch.setattr(screening_jobs, "engine", engine)
+    monkeypatch.setattr(screening_jobs, "executor", BrokenExecutor())
+    active_runs = screening_jobs.active_runs
+
+    with pytest.raises(RuntimeError):
+        submit_screening_run(1)
+
+    assert screening_jobs.active_runs == active_runs
+    with Session(engine) as session:
+        [run] = session.exec(select(ScreeningRun)).all()
+    assert run.status == "failed"
@@ -0,0 +1,194 @@
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.core.fake_models import FakeEmbeddings
+from app.models.candidate import Candidate, CandidateDetails
+from app.models.job import Job, JobApplication, JobDetails
+from app.models.report import CandidateScore, ScreeningReport
+from app.services import screening_results, screening_services, semantic_ranking
+from app.services.screening_services import merge_rankings, run_screening_pipeline_for_job
+from app.services.semantic_ranking import semantic_candidate_matcher
+
+JOB_DETAILS = JobDetails(job_title="Backend Engineer", required_skills=["Python"], required_experience_years=3,
+                         key_responsibilities=["Build APIs"])
+
+
+def scores(*pairs):
+    return [CandidateScore(candidate_id=candidate_id, score=score, justification="") for candidate_id, score in pairs]
+
+
+def ids(ranking):
+    return [score.candidate_id for score in ranking]
+
+
+# --- merge_rankings ---
+
+def test_merge_keeps_stored_order_when_new_candidates_rank_below():
+    # A stored hierarchical ranking: re-ranked finalists (A, B), then a batch-scored tail that is not sorted by score
+    stored = scores(("A", 7), ("B", 6), ("C", 8), ("D", 5))
+    merged = merge_rankings(JOB_DETAILS, stored, scores(("N", 4)), profiles={}, top_k=2)
+    assert ids(merged) == ["A", "B", "C", "D", "N"]
+
+
+def test_merge_inserts_new_candidate_before_first_stored_candidate_it_outscores():
+    stored = scores(("A", 7), ("B", 6), ("C", 8), ("D", 5))
+    merged = merge_rankings(JOB_DETAILS, stored, scores(("M", 9), ("N", 6)), profiles={}, top_k=10)
+    assert ids(merged) == ["M", "A", "B", "C", "N", "D"]
+
+
+def test_merge_ties_keep_stored_candidate_first():
+    merged = merge_rankings(JOB_DETAILS, scores(("A", 7)), scores(("N", 7)), profiles={}, top_k=10)
+    assert ids(merged) == ["A", "N"]
+
+
+def test_merge_reranks_top_k_when_a_new_candidate_reaches_it(monkeypatch):
+    calls = []
+
+    def fake_rerank(job_details, finalists, candidate_profiles):
+        calls.append(ids(finalists))
+        return list(reversed(finalists))
+
+    monkeypatch.setattr(screening_services, "rerank_finalists", fake_rerank)
+    profiles = {candidate_id: CandidateDetails(candidate_id=candidate_id, extracted_skills=[], experience_years=1)
+                for candidate_id in ("A", "B", "C", "N")}
+    merged = merge_rankings(JOB_DETAILS, scores(("A", 7), ("B", 6), ("C", 5)), scores(("N", 9)), profiles, top_k=2)
+    assert calls == [["N", "A"]]
+    assert ids(merged) == ["A", "N", "B", "C"]
+
+
+def test_merge_skips_rerank_when_no_new_candidate_reaches_top_k(monkeypatch):
+    monkeypatch.setattr(screening_services, "rerank_finalists", lambda *args: pytest.fail("unexpected re-rank"))
+    profiles = {candidate_id: CandidateDetails(candidate_id=candidate_id, extracted_skills=[], experience_years=1)
+                for candidate_id in ("A", "B", "N")}
+    merged = merge_rankings(JOB_DETAILS, scores(("A", 7), ("B", 6)), scores(("N", 2)), profiles, top_k=2)
+    assert ids(merged) == ["A", "B", "N"]
+
+
+# --- Incremental pipeline: reuse of stored outcomes ---
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """An in-memory database with one job, and a pipeline whose LLM stages are replaced by stand-ins."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(screening_services, "engine", engine)
+    monkeypatch.setattr(screening_results, "engine", engine)
+    monkeypatch.setattr(screening_services, "PREFILTER_ENABLED", False)
+    monkeypatch.setattr(screening_services, "parse_job", lambda job: JOB_DETAILS)
+    # Stored finalists' profiles are not needed, which also keeps the re-rank out of these tests
+    monkeypatch.setattr(screening_services, "_load_stored_profiles", lambda results: {})
+
+    screened = []
+
+    def fake_screen_applicants(applicants, on_progress=None, on_profile=None, **kwargs):
+        screened.append(sorted(applicant.id for applicant in applicants))
+        return [CandidateDetails(candidate_id=f"CAND_{applicant.id}", extracted_skills=["Python"],
+                                 experience_years=applicant.experience_years) for applicant in applicants]
+
+    def fake_match(job_details, candidate_profiles):
+        # Scores by experience, so the expected ranking is easy to read
+        ranked = sorted(candidate_profiles, key=lambda profile: -profile.experience_years)
+        return ScreeningReport(job_title=job_details.job_title,
+                               ranked_candidates=scores(*((p.candidate_id, p.experience_years) for p in ranked)))
+
+    monkeypatch.setattr(screening_services, "screen_applicants", fake_screen_applicants)
+    monkeypatch.setattr(screening_services, "match_candidates", fake_match)
+
+    with Session(engine) as session:
+        session.add(Job(id=1, title="Backend Engineer", experience_years_required=3))
+        session.commit()
+
+    def add_applicant(candidate_id: int, experience_years: int):
+        with Session(engine) as session:
+            session.add(Candidate(id=candidate_id, name=f"Candidate {candidate_id}", experience_years=experience_years,
+                                  skills_string="Python", resume_text=f"Resume {candidate_id}"))
+            session.add(JobApplication(job_id=1, candidate_id=candidate_id))
+            session.commit()
+
+    def update(model, key, **fields):
+        with Session(engine) as session:
+            row = session.get(model, key)
+            for name, value in fields.items():
+                setattr(row, name, value)
+            session.add(row)
+            session.commit()
+
+    return screened, add_applicant, update
+
+
+def test_incremental_run_only_screens_new_applicants(pipeline):
+    screened, add_applicant, _ = pipeline
+    for candidate_id, experience_years in ((1, 5), (2, 8), (3, 2)):
+        add_applicant(candidate_id, experience_years)
+    run_screening_pipeline_for_job(1, include_resume_text=False, incremental=True)
+
+    add_applicant(4, 6)
+    report = run_screening_pipeline_for_job(1, include_resume_text=False, incremental=True)
+    assert screened == [[1, 2, 3], [4]]
+    assert ids(report.ranked_candidates) == ["CAND_2", "CAND_4", "CAND_1", "CAND_3"]
+
+
+def test_incremental_run_rescreens_changed_resumes(pipeline):
+    screened, add_applicant, update = pipeline
+    add_applicant(1, 5)
+    add_applicant(2, 8)
+    run_screening_pipeline_for_job(1, include_resume_text=False, incremental=True)
+
+    update(Candidate, 1, resume_text="Resume 1, now with ten years", experience_years=10)
+    report = run_screening_pipeline_for_job(1, include_resume_text=False, incremental=True)
+    assert screened == [[1, 2], [1]]
+    assert ids(report.ranked_candidates) == ["CAND_1", "CAND_2"]
+
+
+def test_incremental_run_drops_rejected_applicants_without_screening(pipeline):
+    screened, add_applicant, update = pipeline
+    add_applicant(1, 5)
+    add_applicant(2, 8)
+    run_screening_pipeline_for_job(1, include_resume_text=False, incremental=True)
+
+    update(JobApplication, (1, 2), status="Rejected")
+    report = run_screening_pipeline_for_job(1, include_resume_text=False, incremental=True)
+    assert screened == [[1, 2]]
+    assert ids(report.ranked_candidates) == ["CAND_1"]
+
+
+def test_full_run_screens_everyone_again(pipeline):
+    screened, add_applicant, _ = pipeline
+    add_applicant(1, 5)
+    run_screening_pipeline_for_job(1, include_resume_text=False, incremental=True)
+    run_screening_pipeline_for_job(1, include_resume_text=False, incremental=False)
+    assert screened == [[1], [1]]
+
+
+def test_incremental_vector_runs_keep_candidates_outside_the_shortlist(pipeline, monkeypatch):
+    screened, add_applicant, _ = pipeline
+    monkeypatch.setattr(semantic_ranking, "get_embeddings", FakeEmbeddings)
+    monkeypatch.setattr(semantic_ranking, "score_shortlist", lambda job_details, shortlist: scores(
+        *((profile.candidate_id, profile.experience_years) for profile in shortlist)))
+    monkeypatch.setattr(screening_services, "match_candidates",
+                        lambda job_details, profiles: semantic_candidate_matcher(job_details, profiles, top_k=1))
+    add_applicant(1, 5)
+    add_applicant(2, 8)
+    run_screening_pipeline_for_job(1, include_resume_text=False, incremental=True)
+
+    # The new applicant is scored on their own, so they are ranked or filtered, never dropped
+    add_applicant(3, 2)
+    second = run_screening_pipeline_for_job(1, include_resume_text=False, incremental=True)
+    third = run_screening_pipeline_for_job(1, include_resume_text=False, incremental=True)
+
+    assert screened == [[1, 2], [3]]
+    for report in (second, third):
+        assert len(report.ranked_candidates) == 2
+        assert sorted(ids(report.ranked_candidates) + ids(report.filtered_candidates)) == ["CAND_1", "CAND_2", "CAND_3"]
+    assert ids(third.ranked_candidates) == ids(second.ranked_candidates)
+
+
+def test_full_run_keeps_rejected_applicants(pipeline):
+    screened, add_applicant, update = pipeline
+    add_applicant(1, 5)
+    add_applicant(2, 8)
+    update(JobApplication, (1, 2), status="Rejected")
+    report = run_screening_pipeline_for_job(1, include_resume_text=False, incremental=False)
+    assert screened == [[1, 2]]
+    assert ids(report.ranked_candidates) == ["CAND_2", "CAND_1"]
@@ -0,0 +1,43 @@
+from app.core.fake_models import FakeEmbeddings
+from app.models.candidate import CandidateDetails
+from app.models.job import JobDetails
+from app.models.report import CandidateScore
+from app.services import semantic_ranking
+from app.services.semantic_ranking import rank_by_similarity, semantic_candidate_matcher
+
+JOB_DETAILS = JobDetails(job_title="Data Engineer", required_skills=["Python", "Spark", "Airflow"],
+                         required_experience_years=3, key_responsibilities=["Build data pipelines"])
+
+
+def profiles():
+    skills = [["Python", "Spark", "Airflow"], ["Java", "Spring"], ["Python", "Spark"], ["React", "CSS"]]
+    return [CandidateDetails(candidate_id=f"CAND_{i}", extracted_skills=s, experience_years=3)
+            for i, s in enumerate(skills, start=1)]
+
+
+def test_rank_by_similarity_orders_closest_profiles_first(monkeypatch):
+    monkeypatch.setattr(semantic_ranking, "get_embeddings", FakeEmbeddings)
+    order, similarities = rank_by_similarity(JOB_DETAILS, profiles())
+    assert [int(i) for i in order[:2]] == [0, 2]
+    assert list(similarities) == sorted(similarities, reverse=True)
+
+
+def test_only_llm_scored_shortlist_is_ranked(monkeypatch):
+    monkeypatch.setattr(semantic_ranking, "get_embeddings", FakeEmbeddings)
+    shortlists = []
+
+    def fake_score_shortlist(job_details, shortlist):
+        shortlists.append([profile.candidate_id for profile in shortlist])
+        # The LLM skips the second candidate of the shortlist
+        return [CandidateScore(candidate_id=shortlist[0].candidate_id, score=9, justification="Strong match.")]
+
+    monkeypatch.setattr(semantic_ranking, "score_shortlist", fake_score_shortlist)
+    report = semantic_candidate_matcher(JOB_DETAILS, profiles(), top_k=2)
+
+    assert shortlists == [["CAND_1", "CAND_3"]]
+    assert [score.candidate_id for score in report.ranked_candidates] == ["CAND_1"]
+    filtered = {candidate.candidate_id: candidate for candidate in report.filtered_candidates}
+    assert set(filtered) == {"CAND_2", "CAND_3", "CAND_4"}
+    assert filtered["CAND_3"].reason == "Skipped by the LLM matcher."
+    assert "not reviewed by the LLM" in filtered["CAND_2"].reason
+    assert all(0.0 <= candidate.pre_score <= 1.0 for candidate in report.filtered_candidates)